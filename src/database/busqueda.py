@@ -0,0 +1,77 @@
+from sqlalchemy import Date, text
+
+# Índice FTS5 de contenido externo: guarda solo el índice invertido y lee el texto de
+# proyectos por rowid. unicode61 + remove_diacritics: "via" encuentra "vía", "Bogota" a "Bogotá".
+# prefix='2 3' indexa prefijos cortos para que la búsqueda mientras se escribe sea rápida.
+SQL_CREAR_INDICE_TEXTO = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS proyectos_fts USING fts5(
+        nombre_proyecto,
+        nombre_entidad,
+        content='proyectos',
+        content_rowid='rowid',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+"""
+
+# Los IDs afectados se pasan en la tabla temporal ids_lote (ver db_manager._cargar_ids_lote)
+SQL_INDEXAR_LOTE = text("""
+    INSERT INTO proyectos_fts (rowid, nombre_proyecto, nombre_entidad)
+    SELECT p.rowid, p.nombre_proyecto, p.nombre_entidad
+    FROM proyectos p JOIN ids_lote l ON l.id = p.id
+""")
+
+# Con contenido externo el borrado debe recibir los valores que se indexaron
+SQL_DESINDEXAR_LOTE = text("""
+    INSERT INTO proyectos_fts (proyectos_fts, rowid, nombre_proyecto, nombre_entidad)
+    SELECT 'delete', p.rowid, p.nombre_proyecto, p.nombre_entidad
+    FROM proyectos p JOIN ids_lote l ON l.id = p.id
+""")
+
+# bm25 necesita leer las estadísticas de cada coincidencia: con términos que aparecen en casi
+# todos los contratos ("contrato", "servicios") ordenar todo cuesta cientos de ms. Se ordenan
+# solo los MAX_CANDIDATOS_RANKING coincidencias más recientes (rowid descendente); las
+# búsquedas selectivas, con menos coincidencias que el tope, se ordenan completas.
+MAX_CANDIDATOS_RANKING = 5000
+
+SQL_BUSCAR = text("""
+    SELECT p.id, p.nombre_entidad, p.nombre_proyecto, p.presupuesto_inicial,
+           p.departamento, p.tipo_contrato, p.fecha_inicio
+    FROM (
+        SELECT rowid, rank FROM proyectos_fts
+        WHERE proyectos_fts MATCH :consulta
+        ORDER BY rowid DESC
+        LIMIT :candidatos
+    ) f
+    JOIN proyectos p ON p.rowid = f.rowid
+    ORDER BY f.rank
+    LIMIT :limite OFFSET :offset
+""").columns(fecha_inicio=Date)
+
+
+def consulta_fts(texto):
+    """
+    Convierte lo que escribe el usuario en una consulta FTS5 segura: cada palabra
+    va entre comillas (sin operadores ni sintaxis especial) y como prefijo, y todas
+    deben aparecer. Devuelve None si no queda ninguna palabra.
+    """
+    palabras = [p.replace('"', '""') for p in texto.split()]
+    if not palabras:
+        return None
+    return " ".join(f'"{p}"*' for p in palabras)
+
+
+def indexar_lote(conexion):
+    """Agrega al índice los proyectos de ids_lote (después de insertarlos)."""
+    conexion.execute(SQL_INDEXAR_LOTE)
+
+
+def desindexar_lote(conexion):
+    """Quita del índice los proyectos de ids_lote (antes de borrarlos)."""
+    conexion.execute(SQL_DESINDEXAR_LOTE)
+
+
+def reconstruir_indice_texto(conexion):
+    """Recalcula todo el índice desde la tabla proyectos."""
+    conexion.execute(text(SQL_CREAR_INDICE_TEXTO))
+    conexion.execute(text("INSERT INTO proyectos_fts (proyectos_fts) VALUES ('rebuild')"))
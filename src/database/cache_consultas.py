@@ -0,0 +1,130 @@
+import sys
+import secrets
+import threading
+from collections import OrderedDict
+import pandas as pd
+from sqlalchemy import text
+
+# Contador de generación de escrituras, persistido en la BD para que también lo vean
+# otros procesos (p. ej. el seed corriendo mientras la app está abierta), junto con una
+# identidad aleatoria de la BD: si otro proceso borra y recrea el archivo, el contador
+# vuelve a empezar y podría repetir un valor ya visto, pero la identidad cambia.
+SQL_LEER_GENERACION = text("SELECT clave, valor FROM metadatos WHERE clave IN ('identidad', 'generacion')")
+SQL_CREAR_IDENTIDAD = text("""
+    INSERT INTO metadatos (clave, valor) VALUES ('identidad', :identidad)
+    ON CONFLICT (clave) DO NOTHING
+""")
+SQL_INCREMENTAR_GENERACION = text("""
+    INSERT INTO metadatos (clave, valor) VALUES ('generacion', 1)
+    ON CONFLICT (clave) DO UPDATE SET valor = valor + 1
+""")
+# 'generacion_datos' solo avanza cuando cambian proyectos/adiciones (ingesta, migraciones),
+# no con los puntajes de riesgo ni con reconstrucciones de tablas derivadas: es la marca
+# de vigencia del snapshot de variables de entrenamiento.
+SQL_INCREMENTAR_GENERACION_DATOS = text("""
+    INSERT INTO metadatos (clave, valor) VALUES ('generacion', 1), ('generacion_datos', 1)
+    ON CONFLICT (clave) DO UPDATE SET valor = valor + 1
+""")
+SQL_LEER_GENERACION_DATOS = text("SELECT clave, valor FROM metadatos WHERE clave IN ('identidad', 'generacion_datos')")
+
+
+def leer_generacion(conexion):
+    """(identidad de la BD, generación de escrituras) en una sola lectura."""
+    valores = dict(conexion.execute(SQL_LEER_GENERACION).all())
+    return valores.get("identidad"), valores.get("generacion") or 0
+
+
+def leer_generacion_datos(conexion):
+    """(identidad de la BD, generación de los datos de proyectos) en una sola lectura."""
+    valores = dict(conexion.execute(SQL_LEER_GENERACION_DATOS).all())
+    return valores.get("identidad"), valores.get("generacion_datos") or 0
+
+
+def asegurar_identidad(conexion):
+    """Asigna a la BD su identidad aleatoria si aún no tiene (al crearla o migrarla)."""
+    conexion.execute(SQL_CREAR_IDENTIDAD, {"identidad": secrets.randbits(62)})
+
+
+def incrementar_generacion(conexion, datos=False):
+    """
+    Marca que la BD cambió (dentro de la transacción de la escritura).
+    datos=True si cambiaron proyectos o adiciones: también vence el snapshot de features.
+    """
+    conexion.execute(SQL_INCREMENTAR_GENERACION_DATOS if datos else SQL_INCREMENTAR_GENERACION)
+
+
+def tamano_aproximado(valor):
+    """Bytes aproximados que ocupa un resultado en memoria."""
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(deep=True).sum())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v) for v in valor)
+    return sys.getsizeof(valor)
+
+
+class CacheConsultas:
+    """
+    Caché en memoria de resultados de lectura, con desalojo LRU y tope de bytes.
+    Cada resultado queda asociado a la identidad de la BD y a la generación de escrituras
+    con que se leyó; en cuanto la generación avanza o la BD cambia, todo lo anterior
+    deja de servirse.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict() # clave -> (valor, bytes)
+        self._bytes = 0
+        self._identidad = None
+        self._generacion = None
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, identidad, generacion):
+        """(True, valor) si hay un resultado de esta BD y generación; (False, None) si no."""
+        with self._lock:
+            if not self._vigente(identidad, generacion):
+                self.fallos += 1
+                return False, None # Lector con una generación ya superada
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self.fallos += 1
+                return False, None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+            return True, entrada[0]
+
+    def guardar(self, clave, identidad, generacion, valor):
+        tamano = tamano_aproximado(valor)
+        if tamano > self.max_bytes:
+            return # Un solo resultado más grande que todo el caché no se guarda
+        with self._lock:
+            if not self._vigente(identidad, generacion):
+                return # Se leyó antes de la última escritura: ya no sirve
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._entradas[clave] = (valor, tamano)
+            self._bytes += tamano
+            while self._bytes > self.max_bytes:
+                _, (_, liberados) = self._entradas.popitem(last=False)
+                self._bytes -= liberados
+
+    def _vigente(self, identidad, generacion):
+        """
+        Alinea el caché con (identidad, generación) de una lectura. False si la lectura es
+        de una generación anterior a la que ya tiene el caché (se ignora).
+        """
+        if identidad != self._identidad:
+            self._vaciar(identidad, generacion) # BD recreada: su contador no es comparable
+            return True
+        if self._generacion is not None and generacion < self._generacion:
+            return False
+        if generacion != self._generacion:
+            self._vaciar(identidad, generacion)
+        return True
+
+    def _vaciar(self, identidad, generacion):
+        self._entradas.clear()
+        self._bytes = 0
+        self._identidad = identidad
+        self._generacion = generacion
@@ -0,0 +1,78 @@
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from src.database.cache_consultas import CacheConsultas
+from src.utils.config import Config
+
+# Perfiles de PRAGMAs que se aplican a cada conexión SQLite nueva
+PERFILES_SQLITE = {
+    # WAL: los lectores no esperan al escritor (y viceversa) entre hilos/procesos
+    "rendimiento": {
+        # Debe ir primero: solo surte efecto si se fija antes de crear tablas (o con VACUUM)
+        "auto_vacuum": "INCREMENTAL", # Permite liberar espacio con incremental_vacuum
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024, # 256 MB mapeados en memoria
+        "cache_size": -64000, # Negativo = KiB (~64 MB de caché de páginas)
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000, # ms esperando un lock antes de "database is locked"
+    },
+    # Comportamiento por defecto de SQLite (journal clásico, fsync completo)
+    "seguro": {
+        "auto_vacuum": "INCREMENTAL",
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "busy_timeout": 5000,
+    },
+}
+
+
+class RegistroMotor:
+    """Engine + fábrica de sesiones + caché de consultas compartidos para una URL de base de datos."""
+    def __init__(self, url, perfil):
+        self.url = url
+        self.perfil = perfil
+        self.engine = create_engine(url, echo=False)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.cache_consultas = CacheConsultas(Config.CACHE_CONSULTAS_MAX_MB * 1024 * 1024)
+        self._inicializado = False
+        self._lock = threading.Lock()
+
+        if url.startswith("sqlite"):
+            pragmas = PERFILES_SQLITE[perfil]
+
+            @event.listens_for(self.engine, "connect")
+            def _aplicar_perfil(conexion_dbapi, _registro):
+                cursor = conexion_dbapi.cursor()
+                for nombre, valor in pragmas.items():
+                    cursor.execute(f"PRAGMA {nombre}={valor}")
+                cursor.close()
+
+    def inicializar_una_vez(self, funcion):
+        """Ejecuta `funcion(engine)` solo la primera vez (crear tablas, etc.)."""
+        with self._lock:
+            if not self._inicializado:
+                funcion(self.engine)
+                self._inicializado = True
+
+
+_registros = {}
+_registros_lock = threading.Lock()
+
+
+def obtener_registro(url, perfil=None):
+    """Devuelve el RegistroMotor de `url`, creándolo la primera vez en el proceso."""
+    with _registros_lock:
+        registro = _registros.get(url)
+        if registro is None:
+            registro = RegistroMotor(url, perfil or Config.SQLITE_PERFIL)
+            _registros[url] = registro
+        return registro
+
+
+def liberar_registro(url):
+    """Cierra las conexiones de `url` y lo saca del registro (p. ej. antes de borrar el archivo)."""
+    with _registros_lock:
+        registro = _registros.pop(url, None)
+    if registro is not None:
+        registro.engine.dispose()
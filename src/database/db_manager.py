@@ -1,147 +1,301 @@
 import os
+import time
+import functools
 import pandas as pd
 import numpy as np
-from datetime import date, datetime
-from sqlalchemy import create_engine, desc, func
-from sqlalchemy.orm import sessionmaker, joinedload
-from src.database.models import Base, Proyecto, Adicion, DatosFinancieros
+from datetime import datetime
+from sqlalchemy import and_, desc, func, insert, inspect, select, text, tuple_
+from src.database.busqueda import SQL_BUSCAR, MAX_CANDIDATOS_RANKING, consulta_fts, indexar_lote, desindexar_lote, reconstruir_indice_texto
+from src.database.cache_consultas import asegurar_identidad, incrementar_generacion, leer_generacion, leer_generacion_datos
+from src.database.conexion import obtener_registro
+from src.database.dimensiones import asignar_dimensiones
+from src.database.mantenimiento import optimizar, vaciar, verificar_integridad, reporte_tamanos
+from src.database.migraciones import aplicar_migraciones, marcar_version_actual
+from src.database.models import Base, Proyecto, Adicion, DatosFinancieros, EstadoSincronizacion, ResumenAgregado
+from src.database.resumenes import acumular_resumenes, reconstruir_resumenes
+from src.services.esquema import ESQUEMA_CONTRATOS, COLUMNA_ID, campos_destino
 
 # Definir la ruta de la base de datos
 RUTA_DB = os.path.join("data", "base_datos_app.db")
 URL_DATABASE = f"sqlite:///{RUTA_DB}"
 
+# Filas por sentencia executemany en la inserción masiva
+TAMANO_LOTE_INSERT = 5000
+
+VALORES_VERDADEROS = {'si', 'sí', 'true', 'yes'}
+
+# Coerción vectorizada por tipo de columna del esquema (mismas reglas de limpieza
+# que la antigua ruta fila a fila: numéricos inválidos -> 0, fechas inválidas -> None)
+def _coercionar_texto(serie):
+    return serie.astype(object).where(serie.notna(), None)
+
+def _coercionar_decimal(serie):
+    return pd.to_numeric(serie, errors='coerce').fillna(0.0).astype(float)
+
+def _coercionar_entero(serie):
+    return np.trunc(pd.to_numeric(serie, errors='coerce').fillna(0)).astype('int64')
+
+def _coercionar_fecha(serie):
+    fechas = pd.to_datetime(serie, errors='coerce', format='ISO8601')
+    return fechas.dt.date.astype(object).where(fechas.notna(), None)
+
+def _a_booleano(val):
+    if val is None or (isinstance(val, float) and np.isnan(val)): return False
+    if isinstance(val, str):
+        return val.lower() in VALORES_VERDADEROS
+    return bool(val)
+
+def _coercionar_booleano(serie):
+    return serie.map(_a_booleano).astype(bool)
+
+COERCIONES = {
+    "texto": _coercionar_texto,
+    "decimal": _coercionar_decimal,
+    "entero": _coercionar_entero,
+    "fecha": _coercionar_fecha,
+    "booleano": _coercionar_booleano,
+}
+
+def _coercionar_columnas(df):
+    """Devuelve un DataFrame con cada columna del esquema ya limpia y tipada."""
+    limpio = pd.DataFrame(index=df.index)
+    for c in ESQUEMA_CONTRATOS:
+        serie = df[c.nombre] if c.nombre in df.columns else pd.Series(None, index=df.index, dtype=object)
+        limpio[c.nombre] = COERCIONES[c.tipo](serie)
+    return limpio
+
+def _columnas_para(tabla, limpio):
+    """DataFrame con los campos del modelo de `tabla` (suma columnas fuente repetidas)."""
+    columnas = {}
+    for campo, fuentes in campos_destino(tabla).items():
+        if len(fuentes) == 1:
+            columnas[campo] = limpio[fuentes[0].nombre]
+        else:
+            columnas[campo] = sum(limpio[c.nombre] for c in fuentes)
+    return pd.DataFrame(columnas, index=limpio.index)
+
+def _hash_contenido(limpio):
+    """Huella (hex de 64 bits) de las columnas del esquema de cada fila, ya limpias."""
+    return pd.util.hash_pandas_object(limpio, index=False).map('{:016x}'.format)
+
+def _cargar_ids_lote(session, ids):
+    """Deja los IDs del lote en la tabla temporal ids_lote (una por conexión)."""
+    session.execute(text("CREATE TEMP TABLE IF NOT EXISTS ids_lote (id TEXT PRIMARY KEY)"))
+    session.execute(text("DELETE FROM ids_lote"))
+    session.execute(text("INSERT OR IGNORE INTO ids_lote (id) VALUES (:id)"), [{"id": i} for i in ids])
+
+def _ids_nuevos(session, ids):
+    """
+    Deduplicación en la BD: carga los IDs del lote en una tabla temporal y hace un
+    anti-join contra proyectos (búsquedas por PK). El costo depende del tamaño del
+    lote, no del tamaño de la tabla.
+    """
+    if not ids:
+        return set()
+    _cargar_ids_lote(session, ids)
+    nuevos = session.execute(text(
+        "SELECT l.id FROM ids_lote l "
+        "WHERE NOT EXISTS (SELECT 1 FROM proyectos p WHERE p.id = l.id)"
+    )).scalars().all()
+    session.execute(text("DELETE FROM ids_lote"))
+    return set(nuevos)
+
+def _hashes_existentes(session, ids):
+    """{id: hash_contenido} de los IDs del lote que ya están en proyectos (hash None si es anterior al upsert)."""
+    if not ids:
+        return {}
+    _cargar_ids_lote(session, ids)
+    existentes = dict(session.execute(text(
+        "SELECT p.id, p.hash_contenido FROM ids_lote l JOIN proyectos p ON p.id = l.id"
+    )).all())
+    session.execute(text("DELETE FROM ids_lote"))
+    return existentes
+
+def _eliminar_proyectos(session, ids):
+    """
+    Borra los proyectos dados junto con sus adiciones, datos financieros y puntaje de
+    riesgo, descontándolos antes de la tabla resumen.
+    """
+    if not ids:
+        return
+    _cargar_ids_lote(session, ids)
+    viejos = pd.DataFrame(session.execute(text(
+        "SELECT presupuesto_inicial, departamento, tipo_contrato, fecha_inicio "
+        "FROM proyectos WHERE id IN (SELECT id FROM ids_lote)"
+    )).mappings().all(), columns=["presupuesto_inicial", "departamento", "tipo_contrato", "fecha_inicio"])
+    acumular_resumenes(session, viejos, signo=-1)
+    desindexar_lote(session)
+    for tabla in ("adiciones", "datos_financieros", "puntajes_riesgo"):
+        session.execute(text(f"DELETE FROM {tabla} WHERE proyecto_id IN (SELECT id FROM ids_lote)"))
+    session.execute(text("DELETE FROM proyectos WHERE id IN (SELECT id FROM ids_lote)"))
+    session.execute(text("DELETE FROM ids_lote"))
+
+def _insertar_en_lotes(session, tabla, df):
+    """INSERT masivo (executemany de Core) en lotes de TAMANO_LOTE_INSERT filas."""
+    for inicio in range(0, len(df), TAMANO_LOTE_INSERT):
+        registros = df.iloc[inicio:inicio + TAMANO_LOTE_INSERT].to_dict('records')
+        session.execute(insert(tabla), registros)
+
+# Variables de entrenamiento calculadas en SQL (mismas reglas que la antigua limpieza en Python:
+# textos vacíos -> "Desconocido", duración = fin - inicio en días o 0 si falta alguna fecha)
+SQL_FEATURES_ENTRENAMIENTO = """
+    SELECT
+        p.id AS proyecto_id,
+        p.rowid AS orden_ingreso,
+        COALESCE(p.presupuesto_inicial, 0) AS presupuesto,
+        COALESCE(CAST(julianday(p.fecha_fin) - julianday(p.fecha_inicio) AS INTEGER), 0) AS duracion_estimada,
+        COALESCE(NULLIF(p.tipo_contrato, ''), 'Desconocido') AS tipo_contrato,
+        COALESCE(NULLIF(p.departamento, ''), 'Desconocido') AS departamento,
+        COALESCE(NULLIF(p.nombre_entidad, ''), 'Desconocida') AS entidad,
+        COALESCE(p.departamento_id, 0) AS departamento_id,
+        COALESCE(p.tipo_contrato_id, 0) AS tipo_contrato_id,
+        COALESCE(a.valor_adicionado, 0) AS total_adiciones_dinero,
+        COALESCE(a.tiempo_adicionado_dias, 0) AS total_adiciones_dias
+    FROM proyectos p
+    LEFT JOIN (
+        SELECT proyecto_id,
+               SUM(valor_adicionado) AS valor_adicionado,
+               SUM(tiempo_adicionado_dias) AS tiempo_adicionado_dias
+        FROM adiciones
+        GROUP BY proyecto_id
+    ) a ON a.proyecto_id = p.id
+"""
+
+TIPOS_FEATURES_ENTRENAMIENTO = {
+    'proyecto_id': 'str',
+    'orden_ingreso': 'int64',
+    'presupuesto': 'float64',
+    'duracion_estimada': 'int64',
+    'tipo_contrato': 'category',
+    'departamento': 'category',
+    'entidad': 'category',
+    'departamento_id': 'int64',
+    'tipo_contrato_id': 'int64',
+    'total_adiciones_dinero': 'float64',
+    'total_adiciones_dias': 'int64',
+}
+
+# Proyectos sin puntaje de riesgo de la versión vigente del modelo (nuevos, re-ingeridos
+# por un upsert o puntuados con otra versión), recorridos por rowid en orden ascendente.
+# Las columnas son las variables del modelo con la misma codificación del entrenamiento.
+SQL_PENDIENTES_PUNTAJE = """
+    SELECT
+        p.rowid AS orden_ingreso,
+        p.id AS proyecto_id,
+        COALESCE(p.presupuesto_inicial, 0) AS presupuesto,
+        COALESCE(CAST(julianday(p.fecha_fin) - julianday(p.fecha_inicio) AS INTEGER), 0) AS duracion_estimada,
+        COALESCE(p.departamento_id, 0) AS depto_encoded,
+        COALESCE(p.tipo_contrato_id, 0) AS tipo_encoded,
+        COALESCE(NULLIF(p.nombre_entidad, ''), 'Desconocida') AS entidad
+    FROM proyectos p
+    LEFT JOIN puntajes_riesgo r ON r.proyecto_id = p.id
+    WHERE p.rowid > :cursor AND r.version_modelo IS NOT :version
+    ORDER BY p.rowid
+    LIMIT :tamano
+"""
+
+SQL_FRECUENCIA_ENTIDADES = """
+    SELECT COALESCE(NULLIF(nombre_entidad, ''), 'Desconocida') AS entidad, COUNT(*) AS cantidad
+    FROM proyectos
+    GROUP BY 1
+"""
+
+SQL_GUARDAR_PUNTAJE = """
+    INSERT INTO puntajes_riesgo (proyecto_id, puntaje_riesgo, version_modelo)
+    VALUES (:proyecto_id, :puntaje_riesgo, :version_modelo)
+    ON CONFLICT (proyecto_id) DO UPDATE SET
+        puntaje_riesgo = excluded.puntaje_riesgo,
+        version_modelo = excluded.version_modelo
+"""
+
+# Columnas ligeras del listado paginado (tuplas, sin hidratar objetos ORM)
+COLUMNAS_LISTADO = (
+    Proyecto.id,
+    Proyecto.nombre_entidad,
+    Proyecto.nombre_proyecto,
+    Proyecto.presupuesto_inicial,
+    Proyecto.departamento,
+    Proyecto.tipo_contrato,
+    Proyecto.fecha_inicio,
+)
+
+def _cacheada(metodo):
+    """
+    Lectura servida desde el caché de consultas del engine, con clave método + parámetros,
+    mientras la generación de escrituras de la BD no cambie.
+    """
+    @functools.wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        if self.cache.max_bytes <= 0:
+            return metodo(self, *args, **kwargs)
+        clave = (metodo.__name__, args, tuple(sorted(kwargs.items())))
+        with self.engine.connect() as conexion:
+            identidad, generacion = leer_generacion(conexion)
+        encontrado, valor = self.cache.obtener(clave, identidad, generacion)
+        if not encontrado:
+            valor = metodo(self, *args, **kwargs)
+            self.cache.guardar(clave, identidad, generacion, valor)
+        # Copias superficiales: el llamador puede modificar su resultado sin tocar el caché
+        if isinstance(valor, pd.DataFrame):
+            return valor.copy(deep=False)
+        if isinstance(valor, list):
+            return list(valor)
+        return valor
+    return envoltura
+
 class GestorBaseDatos:
-    def __init__(self):
-        """Inicializa la conexión a la base de datos."""
-        self.engine = create_engine(URL_DATABASE, echo=False)
-        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+    def __init__(self, url=URL_DATABASE):
+        """
+        Inicializa la conexión a la base de datos.
+        El engine y la fábrica de sesiones son compartidos por todo el proceso
+        (uno por URL), así que crear varios gestores es barato.
+        """
+        registro = obtener_registro(url)
+        self.url = url
+        self.engine = registro.engine
+        self.SessionLocal = registro.SessionLocal
+        self.cache = registro.cache_consultas
         
-        # Crear tablas si no existen
-        self._crear_tablas()
+        # Crear tablas si no existen (solo la primera vez por proceso)
+        registro.inicializar_una_vez(self._crear_tablas)
 
-    def _crear_tablas(self):
-        """Crea las tablas en la base de datos SQLite basado en los modelos."""
-        Base.metadata.create_all(bind=self.engine)
+    @staticmethod
+    def _crear_tablas(engine):
+        """
+        Crea las tablas en la base de datos SQLite basado en los modelos
+        y actualiza en sitio las BD existentes con las migraciones pendientes.
+        """
+        bd_nueva = not inspect(engine).has_table(Proyecto.__tablename__)
+        Base.metadata.create_all(bind=engine)
+        if bd_nueva:
+            # create_all ya dejó el esquema en su última versión
+            marcar_version_actual(engine)
+        else:
+            aplicar_migraciones(engine)
+        with engine.begin() as conexion:
+            asegurar_identidad(conexion)
 
     def obtener_sesion(self):
         """Devuelve una nueva sesión de base de datos."""
         return self.SessionLocal()
 
-    def guardar_dataframe(self, df: pd.DataFrame):
+    def guardar_dataframe(self, df: pd.DataFrame, modo="insertar"):
         """
         Recibe un DataFrame de Pandas con datos del SECOP y los guarda en la BD.
-        Mapea las columnas automáticamente.
-        """
-        if df.empty:
-            return 0
-
-        # --- NUEVO: Limpieza Previa ---
-        # 1. Eliminar duplicados en el DataFrame basado en 'referencia_del_contrato'
-        if 'referencia_del_contrato' in df.columns:
-            df = df.drop_duplicates(subset=['referencia_del_contrato'], keep='first')
-
-        # Reemplazar NaN/NaT con None
-        df = df.replace({np.nan: None})
+        El mapeo columna -> campo sale del esquema de ingesta (src.services.esquema).
+        La limpieza se hace por columnas y la escritura con INSERT masivos de Core
+        (sin instanciar objetos ORM por fila).
 
+        modo="insertar": los contratos que ya existen se ignoran.
+        modo="upsert": los contratos que ya existen se reescriben (con sus adiciones y
+        datos financieros) solo si su hash de contenido cambió.
+        Retorna el número de proyectos escritos (nuevos + actualizados).
+        """
         session = self.obtener_sesion()
         try:
-            contador_nuevos = 0
-            ids_existentes = {res[0] for res in session.query(Proyecto.id).all()}
-
-            for _, row in df.iterrows():
-                contrato_id = str(row.get('referencia_del_contrato', ''))
-                if not contrato_id or contrato_id == 'None' or contrato_id == 'nan':
-                    continue 
-                if contrato_id in ids_existentes:
-                    continue 
-
-                # Helpers de limpieza
-                def clean_float(val):
-                    if val is None: return 0.0
-                    try: return float(val)
-                    except: return 0.0
-                
-                def clean_int(val):
-                    if val is None: return 0
-                    try: return int(float(val))
-                    except: return 0
-                
-                def clean_date(val):
-                    if pd.isna(val): return None
-                    if isinstance(val, (date, datetime)):
-                        return val if isinstance(val, date) and not isinstance(val, datetime) else val.date()
-                    try:
-                        if hasattr(val, 'to_pydatetime'):
-                            return val.to_pydatetime().date()
-                        if isinstance(val, str):
-                            return datetime.fromisoformat(val.replace('T', ' ').split('.')[0]).date()
-                    except: pass
-                    return None
-                
-                def clean_bool(val):
-                    if val is None: return False
-                    if isinstance(val, str):
-                        return val.lower() in ['si', 'sí', 'true', 'yes']
-                    return bool(val)
-
-                # 3. Crear Proyecto
-                nuevo_proyecto = Proyecto(
-                    id=contrato_id,
-                    nombre_entidad=row.get('nombre_entidad'),
-                    nombre_proyecto=row.get('objeto_del_contrato') or "No definido",
-                    presupuesto_inicial=clean_float(row.get('valor_del_contrato')),
-                    fecha_inicio=clean_date(row.get('fecha_de_inicio_del_contrato')),
-                    fecha_fin=clean_date(row.get('fecha_de_fin_del_contrato')),
-                    departamento=row.get('departamento'),
-                    municipio=row.get('ciudad'),
-                    tipo_contrato=row.get('tipo_de_contrato'),
-                    es_prorrogable=clean_bool(row.get('el_contrato_puede_ser_prorrogado')),
-                    fecha_ultima_prorroga=clean_date(row.get('fecha_de_notificaci_n_de_prorrogaci_n'))
-                )
-                session.add(nuevo_proyecto)
-                
-                # 4. Crear Adicion (si aplica)
-                val_adiciones = clean_float(row.get('valor_total_de_adiciones'))
-                dias_adicionados = clean_int(row.get('dias_adicionados'))
-                
-                if val_adiciones > 0 or dias_adicionados > 0:
-                    fecha_adicion = clean_date(row.get('fecha_de_firma'))
-                    nueva_adicion = Adicion(
-                        proyecto_id=contrato_id,
-                        fecha=fecha_adicion,
-                        valor_adicionado=val_adiciones,
-                        tiempo_adicionado_dias=dias_adicionados,
-                        descripcion="Modificaciones reportadas en SECOP"
-                    )
-                    session.add(nueva_adicion)
-
-                # 5. NUEVO: Guardar Datos Financieros (Origen de Recursos)
-                pgn = clean_float(row.get('presupuesto_general_de_la_nacion_pgn'))
-                sgp = clean_float(row.get('sistema_general_de_participaciones'))
-                regalias = clean_float(row.get('sistema_general_de_regal_as'))
-                credito = clean_float(row.get('recursos_de_credito'))
-                
-                # Sumar recursos propios (puede venir en dos campos diferentes)
-                rec_propios = clean_float(row.get('recursos_propios')) + \
-                              clean_float(row.get('recursos_propios_alcald_as_gobernaciones_y_resguardos_ind_genas_'))
-                
-                # Solo creamos el registro si hay algún dato financiero relevante
-                if pgn > 0 or sgp > 0 or regalias > 0 or credito > 0 or rec_propios > 0:
-                    datos_fin = DatosFinancieros(
-                        proyecto_id=contrato_id,
-                        pgn=pgn,
-                        sgp=sgp,
-                        regalias=regalias,
-                        recursos_credito=credito,
-                        recursos_propios=rec_propios
-                    )
-                    session.add(datos_fin)
-                
-                contador_nuevos += 1
-            
+            contador_escritos = self.guardar_en_sesion(session, df, modo)
             session.commit()
-            print(f"Guardados {contador_nuevos} proyectos nuevos en la base de datos.")
-            return contador_nuevos
+            return contador_escritos
 
         except Exception as e:
             session.rollback()
@@ -150,57 +304,326 @@ class GestorBaseDatos:
         finally:
             session.close()
 
-    def obtener_todos_proyectos(self):
-        """Obtiene la lista de todos los proyectos (PARA ENTRENAMIENTO)."""
+    def guardar_en_sesion(self, session, df: pd.DataFrame, modo="insertar"):
+        """
+        Lo mismo que guardar_dataframe pero dentro de la transacción de `session`, sin
+        commit. EscritorBaseDatos lo usa para agrupar varios DataFrames en una transacción.
+        """
+        if modo not in ("insertar", "upsert"):
+            raise ValueError(f"Modo de guardado desconocido: {modo}")
+        if df.empty:
+            return 0
+
+        # 1. Limpieza vectorizada de todas las columnas del esquema
+        limpio = _coercionar_columnas(df)
+
+        # 2. Descartar filas sin referencia y duplicados dentro del lote
+        ids = limpio[COLUMNA_ID].astype(str)
+        limpio = limpio[limpio[COLUMNA_ID].notna() & ~ids.isin(['', 'None', 'nan'])]
+        limpio[COLUMNA_ID] = limpio[COLUMNA_ID].astype(str)
+        limpio = limpio.drop_duplicates(subset=[COLUMNA_ID], keep='first')
+
+        hashes = _hash_contenido(limpio)
+
+        ids_cambiados = []
+        if modo == "upsert":
+            existentes = _hashes_existentes(session, limpio[COLUMNA_ID].tolist())
+            ya_existe = limpio[COLUMNA_ID].isin(existentes.keys())
+            cambiado = ya_existe & (limpio[COLUMNA_ID].map(existentes) != hashes)
+            ids_cambiados = limpio.loc[cambiado, COLUMNA_ID].tolist()
+            limpio = limpio[~ya_existe | cambiado]
+            # Los cambiados se borran (descontando el resumen) y se insertan de nuevo abajo
+            _eliminar_proyectos(session, ids_cambiados)
+        else:
+            ids_nuevos = _ids_nuevos(session, limpio[COLUMNA_ID].tolist())
+            limpio = limpio[limpio[COLUMNA_ID].isin(ids_nuevos)]
+
+        if limpio.empty:
+            print("Guardados 0 proyectos nuevos en la base de datos.")
+            return 0
+
+        # 3. Proyectos
+        proyectos = _columnas_para("proyectos", limpio)
+        nombre = proyectos['nombre_proyecto']
+        proyectos['nombre_proyecto'] = nombre.where(nombre.notna() & (nombre != ''), "No definido")
+        proyectos['hash_contenido'] = hashes.loc[limpio.index]
+        # Textos de departamento/municipio/entidad/tipo -> forma canónica + id de dimensión
+        asignar_dimensiones(session, proyectos)
+        _insertar_en_lotes(session, Proyecto.__table__, proyectos)
+        acumular_resumenes(session, proyectos)
+        _cargar_ids_lote(session, proyectos['id'].tolist())
+        indexar_lote(session)
+        session.execute(text("DELETE FROM ids_lote"))
+
+        # 4. Adiciones (solo si hubo dinero o tiempo adicionado)
+        adiciones = _columnas_para("adiciones", limpio)
+        adiciones = adiciones[(adiciones['valor_adicionado'] > 0) | (adiciones['tiempo_adicionado_dias'] > 0)]
+        adiciones.insert(0, 'proyecto_id', limpio.loc[adiciones.index, COLUMNA_ID])
+        adiciones['descripcion'] = "Modificaciones reportadas en SECOP"
+        _insertar_en_lotes(session, Adicion.__table__, adiciones)
+
+        # 5. Datos Financieros (Origen de Recursos), solo si hay algún dato relevante
+        # recursos_propios ya viene sumado (puede venir en dos campos diferentes)
+        financieros = _columnas_para("datos_financieros", limpio)
+        financieros = financieros[(financieros > 0).any(axis=1)]
+        financieros.insert(0, 'proyecto_id', limpio.loc[financieros.index, COLUMNA_ID])
+        _insertar_en_lotes(session, DatosFinancieros.__table__, financieros)
+
+        incrementar_generacion(session, datos=True)
+        contador_escritos = len(proyectos)
+        if ids_cambiados:
+            print(f"Guardados {contador_escritos - len(ids_cambiados)} proyectos nuevos "
+                  f"y {len(ids_cambiados)} actualizados en la base de datos.")
+        else:
+            print(f"Guardados {contador_escritos} proyectos nuevos en la base de datos.")
+        return contador_escritos
+
+    def obtener_marca_agua(self, dataset, departamento):
+        """Devuelve la última marca (:updated_at) sincronizada para (dataset, departamento), o None."""
         session = self.obtener_sesion()
-        # Usar joinedload para cargar las adiciones en la misma consulta
-        proyectos = session.query(Proyecto).options(joinedload(Proyecto.adiciones)).all()
-        session.close()
-        return proyectos
+        try:
+            estado = session.get(EstadoSincronizacion, (dataset, departamento))
+            return estado.marca_agua if estado else None
+        finally:
+            session.close()
 
-    def obtener_ultimos_proyectos(self, limite=100):
-        """Obtiene los últimos N proyectos (PARA DASHBOARD)."""
+    def actualizar_marca_agua(self, dataset, departamento, marca_agua):
+        """
+        Registra la nueva marca de agua (solo avanza, nunca retrocede).
+        No cambia la generación del caché: ninguna lectura cacheada depende de estado_sincronizacion.
+        """
         session = self.obtener_sesion()
-        # Ordenar por fecha de inicio descendente (o por ID si fecha no existe)
-        proyectos = session.query(Proyecto).order_by(desc(Proyecto.fecha_inicio)).limit(limite).all()
-        session.close()
-        return proyectos
+        try:
+            estado = session.get(EstadoSincronizacion, (dataset, departamento))
+            if estado is None:
+                estado = EstadoSincronizacion(dataset=dataset, departamento=departamento)
+                session.add(estado)
+            if marca_agua is not None and (estado.marca_agua is None or marca_agua > estado.marca_agua):
+                estado.marca_agua = marca_agua
+            estado.ultima_sincronizacion = datetime.now()
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    @_cacheada
+    def obtener_features_entrenamiento(self):
+        """
+        Variables para entrenamiento en UNA consulta agregada (PARA ENTRENAMIENTO / CALIBRACIÓN).
+        Suma las adiciones por proyecto y calcula la duración con julianday en SQLite,
+        sin hidratar objetos ORM. Retorna un DataFrame con tipos por columna.
+        """
+        with self.engine.connect() as conexion:
+            df = pd.read_sql(text(SQL_FEATURES_ENTRENAMIENTO), conexion)
+        return df.astype(TIPOS_FEATURES_ENTRENAMIENTO)
+
+    def obtener_frecuencia_entidades(self):
+        """{entidad: fracción de los proyectos} (la codificación entidad_freq del modelo)."""
+        with self.engine.connect() as conexion:
+            filas = conexion.execute(text(SQL_FRECUENCIA_ENTIDADES)).all()
+        total = sum(cantidad for _, cantidad in filas) or 1
+        return {entidad: cantidad / total for entidad, cantidad in filas}
+
+    def obtener_lote_pendiente_puntaje(self, version, cursor=0, tamano=20000):
+        """
+        Siguiente lote (DataFrame) de proyectos sin puntaje de la `version` del modelo, con
+        rowid mayor que `cursor`. El cursor del lote siguiente es el último orden_ingreso.
+        """
+        with self.engine.connect() as conexion:
+            return pd.read_sql(text(SQL_PENDIENTES_PUNTAJE), conexion,
+                               params={"cursor": cursor, "version": version, "tamano": tamano})
+
+    def guardar_puntajes_en_sesion(self, session, proyecto_ids, puntajes, version):
+        """
+        Escribe el puntaje y la versión del modelo de un lote de proyectos en puntajes_riesgo
+        dentro de `session`, sin commit (lo usa EscritorBaseDatos.enviar_puntajes).
+        """
+        registros = [{"proyecto_id": pid, "puntaje_riesgo": float(puntaje), "version_modelo": version}
+                     for pid, puntaje in zip(proyecto_ids, puntajes)]
+        if not registros:
+            return 0
+        session.execute(text(SQL_GUARDAR_PUNTAJE), registros)
+        incrementar_generacion(session)
+        return len(registros)
+
+    def obtener_marca_datos(self):
+        """
+        [identidad de la BD, generación de los datos de proyectos]: cambia con cada escritura
+        de proyectos/adiciones, no con los puntajes de riesgo (vigencia del snapshot).
+        """
+        with self.engine.connect() as conexion:
+            return list(leer_generacion_datos(conexion))
+
+    def obtener_marca_agua_ingesta(self):
+        """fecha_de_firma más reciente ingresada a la BD (None si está vacía)."""
+        with self.engine.connect() as conexion:
+            return conexion.execute(select(func.max(Adicion.fecha))).scalar()
+
+    @_cacheada
+    def obtener_riesgo_promedio(self):
+        """(puntaje_riesgo promedio, proyectos puntuados). Promedio None si nada está puntuado."""
+        with self.engine.connect() as conexion:
+            promedio, cantidad = conexion.execute(text(
+                "SELECT AVG(puntaje_riesgo), COUNT(puntaje_riesgo) FROM puntajes_riesgo"
+            )).one()
+        return promedio, cantidad
+
+    @_cacheada
+    def obtener_pagina_proyectos(self, tamano=100, cursor=None, departamento=None, tipo_contrato=None):
+        """
+        Listado paginado por cursor (keyset) ordenado por (fecha_inicio, id) descendente (PARA DASHBOARD).
+        En vez de OFFSET busca directamente en el índice desde la última fila vista,
+        así que cualquier página cuesta lo mismo que la primera.
+
+        cursor: None para la primera página, o el cursor devuelto por la página anterior.
+        Retorna: (filas, siguiente_cursor). Cada fila es una tupla con COLUMNAS_LISTADO;
+        siguiente_cursor es None cuando no quedan más filas.
+        """
+        filtros = []
+        if departamento:
+            filtros.append(Proyecto.departamento == departamento)
+        if tipo_contrato:
+            filtros.append(Proyecto.tipo_contrato == tipo_contrato)
+
+        # Los proyectos sin fecha_inicio van al final (como NULL en un ORDER BY DESC de SQLite).
+        # Se recorren en dos tramos para que cada uno sea una búsqueda por rango en el índice.
+        fecha_cursor, id_cursor = cursor if cursor else (None, None)
+        tramos = []
+        if cursor is None or fecha_cursor is not None:
+            condicion = Proyecto.fecha_inicio.isnot(None)
+            if cursor is not None:
+                condicion = and_(condicion, tuple_(Proyecto.fecha_inicio, Proyecto.id) < tuple_(fecha_cursor, id_cursor))
+            tramos.append(condicion)
+        condicion = Proyecto.fecha_inicio.is_(None)
+        if cursor is not None and fecha_cursor is None:
+            condicion = and_(condicion, Proyecto.id < id_cursor)
+        tramos.append(condicion)
+
+        filas = []
+        with self.engine.connect() as conexion:
+            for condicion in tramos:
+                faltan = tamano - len(filas)
+                if faltan <= 0:
+                    break
+                consulta = select(*COLUMNAS_LISTADO)\
+                    .where(condicion, *filtros)\
+                    .order_by(desc(Proyecto.fecha_inicio), desc(Proyecto.id))\
+                    .limit(faltan)
+                filas.extend(tuple(f) for f in conexion.execute(consulta))
+
+        if len(filas) < tamano:
+            return filas, None
+        ultima = filas[-1]
+        return filas, (ultima[6], ultima[0])
         
+    @_cacheada
+    def buscar_proyectos(self, texto, limite=50, offset=0):
+        """
+        Búsqueda de texto completo sobre objeto del contrato y entidad (índice FTS5),
+        ordenada por relevancia (bm25). Cada palabra se busca como prefijo y sin tildes.
+        Si hay muchísimas coincidencias se ordenan solo las más recientes (ver MAX_CANDIDATOS_RANKING).
+        Retorna una página de tuplas con las mismas columnas que obtener_pagina_proyectos.
+        """
+        consulta = consulta_fts(texto)
+        if consulta is None:
+            return []
+        with self.engine.connect() as conexion:
+            filas = conexion.execute(SQL_BUSCAR, {
+                "consulta": consulta,
+                "candidatos": max(MAX_CANDIDATOS_RANKING, offset + limite),
+                "limite": limite,
+                "offset": offset,
+            })
+            return [tuple(f) for f in filas]
+
+    @_cacheada
     def obtener_kpis_globales(self):
         """
-        Calcula KPIs usando SQL directo para máxima velocidad.
+        KPIs globales leídos de la tabla resumen (costo constante, sin importar el tamaño de la BD).
         Retorna: (total_proyectos, suma_presupuesto)
         """
         session = self.obtener_sesion()
         try:
-            total = session.query(func.count(Proyecto.id)).scalar()
-            suma = session.query(func.sum(Proyecto.presupuesto_inicial)).scalar() or 0.0
-            return total, suma
+            resumen = session.get(ResumenAgregado, ("global", ""))
+            if resumen is None:
+                return 0, 0.0
+            return resumen.cantidad, resumen.suma_presupuesto or 0.0
         except Exception:
             return 0, 0.0
         finally:
             session.close()
 
-    def obtener_top_departamentos(self):
-        """Top 5 departamentos por número de contratos (SQL Group By)."""
+    @_cacheada
+    def _top_resumen(self, dimension, limite):
+        """[(clave, cantidad)] de una dimensión del resumen, de mayor a menor."""
         session = self.obtener_sesion()
         try:
-            res = session.query(Proyecto.departamento, func.count(Proyecto.id))\
-                .group_by(Proyecto.departamento)\
-                .order_by(desc(func.count(Proyecto.id)))\
-                .limit(5).all()
-            return res # Lista de tuplas (Depto, Cantidad)
+            res = session.query(ResumenAgregado.clave, ResumenAgregado.cantidad)\
+                .filter(ResumenAgregado.dimension == dimension, ResumenAgregado.cantidad > 0)\
+                .order_by(desc(ResumenAgregado.cantidad))\
+                .limit(limite).all()
+            return [(clave or None, cantidad) for clave, cantidad in res]
         finally:
             session.close()
 
+    def obtener_top_departamentos(self):
+        """Top 5 departamentos por número de contratos (desde la tabla resumen)."""
+        return self._top_resumen("departamento", 5) # Lista de tuplas (Depto, Cantidad)
+
     def obtener_tipos_contrato(self):
-        """Top 5 tipos de contrato (SQL Group By)."""
+        """Top 5 tipos de contrato (desde la tabla resumen)."""
+        return self._top_resumen("tipo_contrato", 5) # Lista de tuplas (Tipo, Cantidad)
+
+    @_cacheada
+    def obtener_resumen_anual(self):
+        """[(año, cantidad, suma_presupuesto)] por año de inicio, en orden cronológico."""
         session = self.obtener_sesion()
         try:
-            res = session.query(Proyecto.tipo_contrato, func.count(Proyecto.id))\
-                .group_by(Proyecto.tipo_contrato)\
-                .order_by(desc(func.count(Proyecto.id)))\
-                .limit(5).all()
-            return res # Lista de tuplas (Tipo, Cantidad)
+            res = session.query(ResumenAgregado.clave, ResumenAgregado.cantidad, ResumenAgregado.suma_presupuesto)\
+                .filter(ResumenAgregado.dimension == "anio", ResumenAgregado.cantidad > 0)\
+                .order_by(ResumenAgregado.clave).all()
+            return [(int(clave) if clave else None, cantidad, suma) for clave, cantidad, suma in res]
         finally:
             session.close()
+
+    def reconstruir_resumenes(self):
+        """Recalcula desde cero la tabla resumen_agregados (p. ej. tras ediciones manuales de la BD)."""
+        with self.engine.begin() as conexion:
+            reconstruir_resumenes(conexion)
+            incrementar_generacion(conexion)
+
+    def reconstruir_indice_texto(self):
+        """Recalcula desde cero el índice de búsqueda proyectos_fts (p. ej. tras ediciones manuales de la BD)."""
+        with self.engine.begin() as conexion:
+            reconstruir_indice_texto(conexion)
+            incrementar_generacion(conexion)
+
+    def mantenimiento(self, vacuum=True, vacuum_completo=False, integridad=True, rapido=False):
+        """
+        Mantenimiento del archivo de BD (ver src/database/mantenimiento.py):
+        ANALYZE + PRAGMA optimize, vacuum incremental (o completo), integrity_check
+        y reporte de tamaños. Pensado para correr periódicamente con la app cerrada
+        o en un momento de poca carga (VACUUM toma un bloqueo exclusivo).
+        Retorna un dict con lo que se hizo y el reporte.
+        """
+        resultado = {}
+        with self.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+            inicio = time.time()
+            optimizar(conexion)
+            resultado["segundos_analyze"] = time.time() - inicio
+
+            if vacuum:
+                inicio = time.time()
+                resultado["paginas_antes"], resultado["paginas_despues"] = vaciar(conexion, completo=vacuum_completo)
+                resultado["tamano_pagina"] = conexion.exec_driver_sql("PRAGMA page_size").scalar()
+                resultado["segundos_vacuum"] = time.time() - inicio
+
+            if integridad:
+                inicio = time.time()
+                resultado["problemas_integridad"] = verificar_integridad(conexion, rapido=rapido)
+                resultado["segundos_integridad"] = time.time() - inicio
+
+            resultado["tamanos"] = reporte_tamanos(conexion)
+        return resultado
@@ -0,0 +1,84 @@
+import pandas as pd
+from sqlalchemy import bindparam, text
+from src.database.models import Departamento, Municipio, Entidad, TipoContrato
+from src.services.normalizacion import canonizar
+
+# dimensión -> (modelo de la tabla de dimensión, columna de texto en proyectos, columna de id en proyectos)
+DIMENSIONES = {
+    "departamento": (Departamento, "departamento", "departamento_id"),
+    "municipio": (Municipio, "municipio", "municipio_id"),
+    "entidad": (Entidad, "nombre_entidad", "entidad_id"),
+    "tipo_contrato": (TipoContrato, "tipo_contrato", "tipo_contrato_id"),
+}
+
+# Claves por consulta IN (muy por debajo del límite de parámetros de SQLite)
+TAMANO_LOTE_CLAVES = 900
+
+
+def internar(conexion, dimension, serie):
+    """
+    Canoniza una columna de texto libre y la convierte en ids de su tabla de dimensión,
+    creando las filas que falten (dentro de la transacción del llamador).
+    Retorna (ids, nombres) alineadas con `serie`; None donde el texto estaba vacío.
+    Un valor ya registrado conserva su id y su nombre canónico (el primero que se vio).
+    """
+    tabla = DIMENSIONES[dimension][0].__tablename__
+    claves, nombres = canonizar(dimension, serie)
+
+    pares = pd.DataFrame({"clave": claves, "nombre": nombres}).dropna(subset=["clave"])
+    pares = pares.drop_duplicates(subset=["clave"], keep="first")
+    if pares.empty:
+        vacio = pd.Series(None, index=serie.index, dtype=object)
+        return vacio, vacio.copy()
+
+    conexion.execute(
+        text(f"INSERT INTO {tabla} (clave, nombre) VALUES (:clave, :nombre) ON CONFLICT (clave) DO NOTHING"),
+        pares.to_dict("records"),
+    )
+
+    consulta = text(f"SELECT clave, id, nombre FROM {tabla} WHERE clave IN :claves")\
+        .bindparams(bindparam("claves", expanding=True))
+    registrados = {}
+    lista = pares["clave"].tolist()
+    for inicio in range(0, len(lista), TAMANO_LOTE_CLAVES):
+        for clave, id_dim, nombre in conexion.execute(consulta, {"claves": lista[inicio:inicio + TAMANO_LOTE_CLAVES]}):
+            registrados[clave] = (id_dim, nombre)
+
+    ids = pd.Series([registrados[c][0] if c in registrados else None for c in claves], index=serie.index, dtype=object)
+    canonicos = pd.Series([registrados[c][1] if c in registrados else None for c in claves], index=serie.index, dtype=object)
+    return ids, canonicos
+
+
+def asignar_dimensiones(conexion, proyectos):
+    """Reemplaza en `proyectos` los textos por su forma canónica y agrega las columnas *_id."""
+    for dimension, (_, columna, columna_id) in DIMENSIONES.items():
+        ids, canonicos = internar(conexion, dimension, proyectos[columna])
+        proyectos[columna] = canonicos
+        proyectos[columna_id] = ids
+
+
+def poblar_dimensiones(conexion):
+    """
+    Migración de BD existentes: interna los textos ya guardados en proyectos,
+    los reescribe en su forma canónica y llena las columnas *_id.
+    """
+    conexion.execute(text("CREATE TEMP TABLE IF NOT EXISTS mapa_dimension (texto TEXT PRIMARY KEY, id INTEGER, nombre TEXT)"))
+    for dimension, (_, columna, columna_id) in DIMENSIONES.items():
+        distintos = conexion.execute(text(
+            f"SELECT DISTINCT {columna} FROM proyectos WHERE {columna} IS NOT NULL"
+        )).scalars().all()
+        if not distintos:
+            continue
+        serie = pd.Series(distintos, dtype=object)
+        ids, canonicos = internar(conexion, dimension, serie)
+
+        conexion.execute(text("DELETE FROM mapa_dimension"))
+        conexion.execute(
+            text("INSERT INTO mapa_dimension (texto, id, nombre) VALUES (:texto, :id, :nombre)"),
+            [{"texto": t, "id": i, "nombre": n} for t, i, n in zip(serie, ids, canonicos)],
+        )
+        conexion.execute(text(
+            f"UPDATE proyectos SET {columna_id} = m.id, {columna} = m.nombre "
+            f"FROM mapa_dimension m WHERE m.texto = proyectos.{columna}"
+        ))
+    conexion.execute(text("DROP TABLE mapa_dimension"))
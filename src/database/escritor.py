@@ -0,0 +1,135 @@
+import queue
+import functools
+import threading
+from concurrent.futures import Future
+from src.database.db_manager import GestorBaseDatos, URL_DATABASE
+from src.utils.config import Config
+
+_FIN = object() # Señal de cierre para el hilo escritor
+
+
+class EscritorBaseDatos:
+    """
+    Único escritor de la BD en el proceso: un hilo dedicado recibe escrituras (DataFrames
+    descargados, lotes de puntajes de riesgo) por una cola acotada y las aplica agrupando
+    las que estén esperando en una sola transacción de hasta `max_filas` filas
+    (transacciones cortas y acotadas: los lectores en WAL nunca esperan a un escritor largo).
+
+    enviar() y enviar_puntajes() devuelven un Future con el número de filas escritas.
+    Si la cola está llena, esperan (contrapresión hacia quien descarga o puntúa).
+    """
+    def __init__(self, url=URL_DATABASE, max_filas=None, max_pendientes=None):
+        self.gestor = GestorBaseDatos(url=url)
+        self.max_filas = max_filas or Config.ESCRITOR_MAX_FILAS_TRANSACCION
+        self._cola = queue.Queue(maxsize=max_pendientes or Config.ESCRITOR_COLA_MAXIMA)
+        self._cerrado = False
+        # Hace atómicos "¿está cerrado?" + put: nada puede entrar a la cola detrás de _FIN
+        self._lock_cierre = threading.Lock()
+        self._hilo = threading.Thread(target=self._bucle, name="escritor-bd", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, df, modo="insertar"):
+        """Encola un DataFrame para guardar_dataframe(df, modo). Retorna un Future[int]."""
+        return self._encolar(functools.partial(self.gestor.guardar_en_sesion, df=df, modo=modo), len(df))
+
+    def enviar_puntajes(self, proyecto_ids, puntajes, version):
+        """Encola un lote de puntajes de riesgo para puntajes_riesgo. Retorna un Future[int]."""
+        tarea = functools.partial(self.gestor.guardar_puntajes_en_sesion,
+                                  proyecto_ids=proyecto_ids, puntajes=puntajes, version=version)
+        return self._encolar(tarea, len(proyecto_ids))
+
+    def _encolar(self, tarea, filas):
+        """Encola tarea(session) -> resultado, que cuenta `filas` para el tope por transacción."""
+        futuro = Future()
+        with self._lock_cierre:
+            if self._cerrado:
+                raise RuntimeError("El escritor de la base de datos ya fue cerrado.")
+            self._cola.put((tarea, filas, futuro))
+        return futuro
+
+    def cerrar(self, esperar=True):
+        """Guarda lo que quede en la cola y detiene el hilo."""
+        with self._lock_cierre:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._cola.put(_FIN)
+        if esperar:
+            self._hilo.join()
+
+    def _bucle(self):
+        while True:
+            item = self._cola.get()
+            if item is _FIN:
+                return
+            lote, filas, fin = [item], item[1], False
+            # Agrupar lo que ya esté esperando, sin pasarse del tope de filas por transacción
+            while filas < self.max_filas:
+                try:
+                    siguiente = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is _FIN:
+                    fin = True
+                    break
+                lote.append(siguiente)
+                filas += siguiente[1]
+            self._escribir(lote)
+            if fin:
+                return
+
+    def _escribir(self, lote):
+        lote = [item for item in lote if item[2].set_running_or_notify_cancel()]
+        if not lote:
+            return
+        session = self.gestor.obtener_sesion()
+        try:
+            resultados = [tarea(session) for tarea, _, _ in lote]
+            session.commit()
+        except Exception:
+            session.rollback()
+            resultados = None
+        finally:
+            session.close()
+
+        if resultados is not None:
+            for (_, _, futuro), escritos in zip(lote, resultados):
+                futuro.set_result(escritos)
+            return
+
+        # Alguna escritura falló: reintentar una por una para que solo falle la suya
+        for tarea, _, futuro in lote:
+            session = self.gestor.obtener_sesion()
+            try:
+                resultado = tarea(session)
+                session.commit()
+                futuro.set_result(resultado)
+            except Exception as e:
+                session.rollback()
+                print(f"Error guardando en la base de datos: {e}")
+                futuro.set_exception(e)
+            finally:
+                session.close()
+
+
+_escritores = {}
+_escritores_lock = threading.Lock()
+
+
+def obtener_escritor(url=URL_DATABASE):
+    """Devuelve el escritor de `url` compartido por todo el proceso, creándolo la primera vez."""
+    with _escritores_lock:
+        escritor = _escritores.get(url)
+        if escritor is None:
+            escritor = EscritorBaseDatos(url=url)
+            _escritores[url] = escritor
+        return escritor
+
+
+def cerrar_escritores():
+    """Vacía y detiene todos los escritores (al cerrar la aplicación o un script)."""
+    with _escritores_lock:
+        escritores = list(_escritores.values())
+        _escritores.clear()
+    for escritor in escritores:
+        escritor.cerrar()
@@ -0,0 +1,80 @@
+"""
+Mantenimiento del archivo SQLite: estadísticas del planificador, recuperación de
+espacio, verificación de integridad y reporte de tamaños por tabla/índice.
+
+Todas las funciones reciben una conexión en modo AUTOCOMMIT (VACUUM no puede
+correr dentro de una transacción).
+"""
+
+# auto_vacuum: 0 = NONE, 1 = FULL, 2 = INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+def optimizar(conexion):
+    """Recalcula las estadísticas que usa el planificador de consultas (sqlite_stat1)."""
+    conexion.exec_driver_sql("ANALYZE")
+    conexion.exec_driver_sql("PRAGMA optimize")
+
+
+def vaciar(conexion, completo=False):
+    """
+    Devuelve al sistema de archivos las páginas libres que dejan los borrados y upserts.
+    La primera vez (o con completo=True) hace un VACUUM completo, que además desfragmenta
+    y deja la BD en auto_vacuum=INCREMENTAL; después basta con incremental_vacuum.
+    Retorna (páginas_antes, páginas_después).
+    """
+    paginas_antes = conexion.exec_driver_sql("PRAGMA page_count").scalar()
+    modo = conexion.exec_driver_sql("PRAGMA auto_vacuum").scalar()
+    if completo or modo != AUTO_VACUUM_INCREMENTAL:
+        conexion.exec_driver_sql(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+        conexion.exec_driver_sql("VACUUM")
+    else:
+        conexion.exec_driver_sql("PRAGMA incremental_vacuum")
+    # En WAL las páginas liberadas llegan al archivo principal con el checkpoint
+    conexion.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").all()
+    return paginas_antes, conexion.exec_driver_sql("PRAGMA page_count").scalar()
+
+
+def verificar_integridad(conexion, rapido=False):
+    """
+    integrity_check (o quick_check, que no valida índices contra tablas) más la
+    verificación del índice de texto completo. Retorna la lista de problemas ([] = ok).
+    """
+    pragma = "quick_check" if rapido else "integrity_check"
+    problemas = [fila[0] for fila in conexion.exec_driver_sql(f"PRAGMA {pragma}") if fila[0] != "ok"]
+    problemas += [f"foreign_key_check: {fila}" for fila in conexion.exec_driver_sql("PRAGMA foreign_key_check")]
+    try:
+        conexion.exec_driver_sql("INSERT INTO proyectos_fts (proyectos_fts, rank) VALUES ('integrity-check', 1)")
+    except Exception as e:
+        problemas.append(f"proyectos_fts: {e} (reconstruir con reconstruir_indice_texto)")
+    return problemas
+
+
+def reporte_tamanos(conexion):
+    """
+    [(nombre, tipo, tabla, filas, páginas, bytes, bytes_sin_uso)] de cada tabla e índice,
+    de mayor a menor. filas es None para los índices. Usa la tabla virtual dbstat; si el
+    SQLite instalado no la trae, páginas y bytes quedan en None.
+    """
+    objetos = conexion.exec_driver_sql(
+        "SELECT name, type, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')"
+    ).all()
+
+    try:
+        uso = {nombre: (paginas, bytes_, sin_uso) for nombre, paginas, bytes_, sin_uso in conexion.exec_driver_sql(
+            "SELECT name, COUNT(*), SUM(pgsize), SUM(unused) FROM dbstat GROUP BY name"
+        )}
+    except Exception:
+        uso = {}
+
+    reporte = []
+    for nombre, tipo, tabla in objetos:
+        filas = None
+        if tipo == "table":
+            try:
+                filas = conexion.exec_driver_sql(f'SELECT COUNT(*) FROM "{nombre}"').scalar()
+            except Exception:
+                pass # Tablas sombra de FTS5 o virtuales sin soporte de COUNT
+        paginas, bytes_, sin_uso = uso.get(nombre, (None, None, None))
+        reporte.append((nombre, tipo, tabla, filas, paginas, bytes_, sin_uso))
+    return sorted(reporte, key=lambda fila: fila[5] or 0, reverse=True)
@@ -0,0 +1,103 @@
+"""
+Migraciones de esquema versionadas para bases de datos existentes.
+
+create_all() crea las tablas que faltan pero nunca altera las que ya existen,
+así que los cambios sobre tablas existentes (índices, columnas nuevas...) se
+declaran aquí. La versión aplicada se guarda en PRAGMA user_version.
+
+Cada paso debe ser idempotente: en una BD nueva create_all ya creó el estado
+final y la migración solo registra la versión.
+"""
+
+from src.database.busqueda import reconstruir_indice_texto
+from src.database.cache_consultas import incrementar_generacion
+from src.database.dimensiones import poblar_dimensiones
+from src.database.resumenes import reconstruir_resumenes
+
+
+def _agregar_columna(tabla, columna, tipo):
+    """Paso idempotente: ALTER TABLE ... ADD COLUMN solo si la columna aún no existe."""
+    def paso(conexion):
+        existentes = [fila[1] for fila in conexion.exec_driver_sql(f"PRAGMA table_info({tabla})")]
+        if columna not in existentes:
+            conexion.exec_driver_sql(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+    return paso
+
+
+# (versión, descripción, pasos). Un paso es SQL o una función que recibe la conexión.
+MIGRACIONES = [
+    (1, "Índices secundarios para agregados del dashboard y joins del modelo", [
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_departamento ON proyectos (departamento)",
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_tipo_contrato ON proyectos (tipo_contrato)",
+        "CREATE INDEX IF NOT EXISTS ix_adiciones_proyecto_id ON adiciones (proyecto_id)",
+        "CREATE INDEX IF NOT EXISTS ix_datos_financieros_proyecto_id ON datos_financieros (proyecto_id)",
+    ]),
+    (2, "Tabla resumen_agregados para los KPIs del dashboard", [
+        # create_all ya creó la tabla vacía. Se llena en la migración 6: la reconstrucción
+        # agrupa por las columnas *_id, que aún no existen en esta versión del esquema.
+    ]),
+    (3, "Índices compuestos (..., fecha_inicio, id) para la paginación por cursor", [
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_fecha_inicio_id ON proyectos (fecha_inicio, id)",
+        # Con filtro, el listado busca el rango del departamento/tipo ya en orden
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_departamento_fecha_inicio_id ON proyectos (departamento, fecha_inicio, id)",
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_tipo_contrato_fecha_inicio_id ON proyectos (tipo_contrato, fecha_inicio, id)",
+    ]),
+    (4, "Columna hash_contenido para el modo upsert de guardar_dataframe", [
+        # Las filas existentes quedan con NULL: el primer upsert las reescribe una vez
+        _agregar_columna("proyectos", "hash_contenido", "VARCHAR"),
+    ]),
+    (5, "Índice de texto completo (FTS5) proyectos_fts sobre objeto y entidad", [
+        reconstruir_indice_texto,
+    ]),
+    (6, "Tablas de dimensión (departamento, municipio, entidad, tipo) con claves enteras", [
+        # create_all ya creó las tablas dim_*; faltan las columnas *_id en proyectos
+        _agregar_columna("proyectos", "departamento_id", "INTEGER"),
+        _agregar_columna("proyectos", "municipio_id", "INTEGER"),
+        _agregar_columna("proyectos", "entidad_id", "INTEGER"),
+        _agregar_columna("proyectos", "tipo_contrato_id", "INTEGER"),
+        poblar_dimensiones,
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_departamento_id ON proyectos (departamento_id)",
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_entidad_id ON proyectos (entidad_id)",
+        "CREATE INDEX IF NOT EXISTS ix_proyectos_tipo_contrato_id ON proyectos (tipo_contrato_id)",
+        # Los textos quedaron en su forma canónica: recalcular lo que se deriva de ellos
+        reconstruir_resumenes,
+        reconstruir_indice_texto,
+    ]),
+    (7, "Tabla puntajes_riesgo para el puntaje del modelo de riesgo por proyecto", [
+        # create_all ya creó puntajes_riesgo; datos_financieros no cambia
+    ]),
+]
+
+VERSION_ESQUEMA = MIGRACIONES[-1][0]
+
+
+def version_actual(conexion):
+    return conexion.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def marcar_version_actual(engine):
+    """Registra una BD recién creada con create_all como ya migrada a la última versión."""
+    with engine.begin() as conexion:
+        conexion.exec_driver_sql(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+
+
+def aplicar_migraciones(engine):
+    """Aplica en orden las migraciones pendientes. Devuelve la lista de versiones aplicadas."""
+    aplicadas = []
+    with engine.begin() as conexion:
+        version = version_actual(conexion)
+        for numero, descripcion, pasos in MIGRACIONES:
+            if numero <= version:
+                continue
+            print(f"🛠️  Migrando BD a la versión {numero}: {descripcion}")
+            for paso in pasos:
+                if callable(paso):
+                    paso(conexion)
+                else:
+                    conexion.exec_driver_sql(paso)
+            conexion.exec_driver_sql(f"PRAGMA user_version = {numero}")
+            aplicadas.append(numero)
+        if aplicadas:
+            # Las migraciones pueden reescribir datos: invalidar caché y snapshot
+            incrementar_generacion(conexion, datos=True)
+    return aplicadas
@@ -1,9 +1,28 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, ForeignKey, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, ForeignKey, Boolean, Index, DDL, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
+from src.database.busqueda import SQL_CREAR_INDICE_TEXTO
 
 Base = declarative_base()
 
+class DimensionMixin:
+    """Valor canónico de un texto repetido (departamento, entidad...) con id entero estable."""
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    clave = Column(String, unique=True, nullable=False) # Texto normalizado (sin tildes, minúsculas)
+    nombre = Column(String) # Forma canónica para mostrar
+
+class Departamento(DimensionMixin, Base):
+    __tablename__ = 'dim_departamentos'
+
+class Municipio(DimensionMixin, Base):
+    __tablename__ = 'dim_municipios'
+
+class Entidad(DimensionMixin, Base):
+    __tablename__ = 'dim_entidades'
+
+class TipoContrato(DimensionMixin, Base):
+    __tablename__ = 'dim_tipos_contrato'
+
 class Proyecto(Base):
     __tablename__ = 'proyectos'
 
@@ -11,25 +30,45 @@ class Proyecto(Base):
     nombre_entidad = Column(String)
     nombre_proyecto = Column(String)
     presupuesto_inicial = Column(Float)
-    fecha_inicio = Column(Date)
+    fecha_inicio = Column(Date) # Indexada por ix_proyectos_fecha_inicio_id (fecha_inicio, id)
     fecha_fin = Column(Date) # Fecha final prevista inicial
-    departamento = Column(String)
+    departamento = Column(String, index=True)
     municipio = Column(String)
-    tipo_contrato = Column(String) # Licitación, directa, etc.
+    tipo_contrato = Column(String, index=True) # Licitación, directa, etc.
+
+    # Claves enteras de las dimensiones (los textos de arriba guardan su forma canónica)
+    departamento_id = Column(Integer, ForeignKey('dim_departamentos.id'), index=True)
+    municipio_id = Column(Integer, ForeignKey('dim_municipios.id'))
+    entidad_id = Column(Integer, ForeignKey('dim_entidades.id'), index=True)
+    tipo_contrato_id = Column(Integer, ForeignKey('dim_tipos_contrato.id'), index=True)
     
     # Nuevos campos solicitados
     es_prorrogable = Column(Boolean, default=False)
     fecha_ultima_prorroga = Column(Date, nullable=True)
+
+    # Huella de los datos fuente del contrato (detecta cambios al re-ingerir en modo upsert)
+    hash_contenido = Column(String, nullable=True)
     
     # Relaciones
     adiciones = relationship("Adicion", back_populates="proyecto")
     datos_financieros = relationship("DatosFinancieros", uselist=False, back_populates="proyecto")
 
+    __table_args__ = (
+        # Paginación por cursor (keyset) del listado: ORDER BY fecha_inicio DESC, id DESC
+        Index('ix_proyectos_fecha_inicio_id', 'fecha_inicio', 'id'),
+        # Mismo orden con filtro por departamento o tipo de contrato (sin ordenar en memoria)
+        Index('ix_proyectos_departamento_fecha_inicio_id', 'departamento', 'fecha_inicio', 'id'),
+        Index('ix_proyectos_tipo_contrato_fecha_inicio_id', 'tipo_contrato', 'fecha_inicio', 'id'),
+    )
+
+# Índice de texto completo sobre proyectos (create_all no conoce las tablas virtuales FTS5)
+event.listen(Proyecto.__table__, "after_create", DDL(SQL_CREAR_INDICE_TEXTO))
+
 class Adicion(Base):
     __tablename__ = 'adiciones'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    proyecto_id = Column(String, ForeignKey('proyectos.id'))
+    proyecto_id = Column(String, ForeignKey('proyectos.id'), index=True)
     fecha = Column(Date)
     valor_adicionado = Column(Float, default=0.0) # Valor adicionado en dinero
     tiempo_adicionado_dias = Column(Integer, default=0) # Tiempo adicionado en días
@@ -41,7 +80,7 @@ class DatosFinancieros(Base):
     __tablename__ = 'datos_financieros'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    proyecto_id = Column(String, ForeignKey('proyectos.id'))
+    proyecto_id = Column(String, ForeignKey('proyectos.id'), index=True)
     
     # Fuentes de Financiación (Origen de Recursos SECOP)
     pgn = Column(Float, default=0.0) # Presupuesto General Nación
@@ -51,7 +90,42 @@ class DatosFinancieros(Base):
     recursos_credito = Column(Float, default=0.0) # Crédito
     
     # Resultados simulados (se llenarán después del análisis)
-    puntaje_riesgo = Column(Float) # 0 a 1
+    puntaje_riesgo = Column(Float) # 0 a 1 (el modelo de riesgo escribe en puntajes_riesgo)
     margen_predicho = Column(Float)
     
     proyecto = relationship("Proyecto", back_populates="datos_financieros")
+
+class PuntajeRiesgo(Base):
+    __tablename__ = 'puntajes_riesgo'
+
+    # Puntaje del modelo de riesgo por proyecto, lo llena MotorIA.puntuar_portafolio.
+    # Tabla propia: puntuar no crea filas de datos_financieros para proyectos sin fuentes.
+    proyecto_id = Column(String, ForeignKey('proyectos.id'), primary_key=True)
+    puntaje_riesgo = Column(Float) # 0 a 1 (probabilidad de adiciones)
+    version_modelo = Column(String) # Modelo que calculó el puntaje (sin fila = pendiente)
+
+class EstadoSincronizacion(Base):
+    __tablename__ = 'estado_sincronizacion'
+
+    # Marca de agua (high-water mark) por dataset y departamento para la sincronización incremental
+    dataset = Column(String, primary_key=True)
+    departamento = Column(String, primary_key=True)
+    marca_agua = Column(DateTime) # :updated_at (Socrata, UTC) más reciente ya ingerido
+    ultima_sincronizacion = Column(DateTime)
+
+class ResumenAgregado(Base):
+    __tablename__ = 'resumen_agregados'
+
+    # Agregados precalculados para el dashboard, mantenidos por guardar_dataframe
+    dimension = Column(String, primary_key=True) # 'global' | 'departamento' | 'tipo_contrato' | 'anio'
+    clave = Column(String, primary_key=True) # Valor de la dimensión ('' = sin dato)
+    cantidad = Column(Integer, default=0)
+    suma_presupuesto = Column(Float, default=0.0)
+
+class Metadato(Base):
+    __tablename__ = 'metadatos'
+
+    # Valores internos de la BD; 'generacion' cuenta las escrituras (invalida el caché de consultas)
+    # y 'generacion_datos' solo las de proyectos/adiciones (vigencia del snapshot de features)
+    clave = Column(String, primary_key=True)
+    valor = Column(Integer, default=0)
@@ -0,0 +1,69 @@
+import pandas as pd
+from sqlalchemy import text
+
+# Dimensiones de la tabla resumen_agregados ('global' tiene una sola clave: '')
+DIMENSIONES_RESUMEN = ("global", "departamento", "tipo_contrato", "anio")
+
+SQL_ACUMULAR = text("""
+    INSERT INTO resumen_agregados (dimension, clave, cantidad, suma_presupuesto)
+    VALUES (:dimension, :clave, :cantidad, :suma_presupuesto)
+    ON CONFLICT (dimension, clave) DO UPDATE SET
+        cantidad = cantidad + excluded.cantidad,
+        suma_presupuesto = suma_presupuesto + excluded.suma_presupuesto
+""")
+
+# Reconstrucción completa desde proyectos (misma definición de clave que acumular_resumenes)
+SQL_RECONSTRUIR = [
+    "DELETE FROM resumen_agregados",
+    """INSERT INTO resumen_agregados (dimension, clave, cantidad, suma_presupuesto)
+       SELECT 'global', '', COUNT(*), COALESCE(SUM(presupuesto_inicial), 0) FROM proyectos""",
+    # Agrupa por la clave entera de la dimensión; el nombre sale de la tabla dim_*
+    """INSERT INTO resumen_agregados (dimension, clave, cantidad, suma_presupuesto)
+       SELECT 'departamento', COALESCE(MAX(d.nombre), ''), COUNT(*), COALESCE(SUM(p.presupuesto_inicial), 0)
+       FROM proyectos p LEFT JOIN dim_departamentos d ON d.id = p.departamento_id
+       GROUP BY p.departamento_id""",
+    """INSERT INTO resumen_agregados (dimension, clave, cantidad, suma_presupuesto)
+       SELECT 'tipo_contrato', COALESCE(MAX(t.nombre), ''), COUNT(*), COALESCE(SUM(p.presupuesto_inicial), 0)
+       FROM proyectos p LEFT JOIN dim_tipos_contrato t ON t.id = p.tipo_contrato_id
+       GROUP BY p.tipo_contrato_id""",
+    """INSERT INTO resumen_agregados (dimension, clave, cantidad, suma_presupuesto)
+       SELECT 'anio', COALESCE(strftime('%Y', fecha_inicio), ''), COUNT(*), COALESCE(SUM(presupuesto_inicial), 0)
+       FROM proyectos GROUP BY 2""",
+]
+
+
+def _claves(proyectos):
+    """Clave de cada proyecto en cada dimensión (None -> '')."""
+    anios = pd.to_datetime(proyectos["fecha_inicio"], errors="coerce").dt.year
+    return pd.DataFrame({
+        "global": "",
+        "departamento": proyectos["departamento"].fillna("").astype(str),
+        "tipo_contrato": proyectos["tipo_contrato"].fillna("").astype(str),
+        "anio": anios.map(lambda a: "" if pd.isna(a) else str(int(a))),
+    }, index=proyectos.index)
+
+
+def acumular_resumenes(conexion, proyectos, signo=1):
+    """
+    Suma (signo=1) o resta (signo=-1) al resumen los proyectos dados, dentro de la
+    transacción del llamador. `proyectos` necesita las columnas presupuesto_inicial,
+    departamento, tipo_contrato y fecha_inicio.
+    """
+    if proyectos.empty:
+        return
+    claves = _claves(proyectos)
+    presupuesto = proyectos["presupuesto_inicial"].fillna(0.0).astype(float)
+
+    filas = []
+    for dimension in DIMENSIONES_RESUMEN:
+        grupos = presupuesto.groupby(claves[dimension]).agg(["count", "sum"])
+        for clave, (cantidad, suma) in grupos.iterrows():
+            filas.append({"dimension": dimension, "clave": clave,
+                          "cantidad": signo * int(cantidad), "suma_presupuesto": signo * float(suma)})
+    conexion.execute(SQL_ACUMULAR, filas)
+
+
+def reconstruir_resumenes(conexion):
+    """Recalcula todo el resumen desde la tabla proyectos."""
+    for sql in SQL_RECONSTRUIR:
+        conexion.execute(text(sql))
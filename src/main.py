@@ -3,6 +3,8 @@ from PyQt6.QtWidgets import QApplication, QMainWindow, QTabWidget
 from src.ui.download_view import VistaDescarga
 from src.ui.dashboard import Dashboard
 from src.ui.ml_view import VistaML
+from src.database.escritor import cerrar_escritores
+from src.services.almacen_modelos import migrar_modelo_legado
 
 class VentanaPrincipal(QMainWindow):
     def __init__(self):
@@ -32,6 +34,12 @@ def main():
     
     # Aplicar un estilo visual básico (Fusion)
     app.setStyle("Fusion")
+
+    # Al salir, terminar de guardar lo que el escritor de la BD tenga en cola
+    app.aboutToQuit.connect(cerrar_escritores)
+
+    # Instalaciones anteriores al almacén de modelos: importar data/modelo_entrenado.pkl una vez
+    migrar_modelo_legado()
     
     window = VentanaPrincipal()
     window.show()
@@ -0,0 +1,32 @@
+import argparse
+from src.services.ml_engine import MotorIA
+
+# Búsqueda de hiperparámetros con tiempo acotado, p. ej. 10 minutos y re-entrenar con lo mejor:
+#   python -m src.scripts.ajustar_modelo --minutos 10 --entrenar
+
+def ajustar(minutos=None, procesos=None, entrenar=False):
+    motor = MotorIA()
+    res = motor.ajustar_hiperparametros(presupuesto_segundos=minutos * 60 if minutos else None, procesos=procesos)
+    if "error" in res:
+        print(f"❌ {res['error']}")
+        return res
+    if res["puntaje_cv"] is None:
+        print("⚠️ Ninguna configuración terminó dentro del presupuesto; no se guardó nada.")
+        return res
+
+    base = "-" if res["puntaje_base"] is None else f"{res['puntaje_base']:.2%}"
+    print(f"   Mejor: {res['puntaje_cv']:.2%} (configuración base: {base})")
+    print(f"   Parámetros: {res['parametros']}")
+    print(f"   {res['evaluadas']} evaluadas, {res['descartadas']} detenidas antes de tiempo, {res['segundos']:.0f}s")
+
+    if entrenar:
+        motor.entrenar(modo="completo")
+    return res
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Búsqueda de hiperparámetros del Random Forest con presupuesto de tiempo.")
+    parser.add_argument("--minutos", type=float, help="Presupuesto de reloj (por defecto BUSQUEDA_PRESUPUESTO_SEGUNDOS).")
+    parser.add_argument("--procesos", type=int, help="Procesos del pool (por defecto núcleos - 1).")
+    parser.add_argument("--entrenar", action="store_true", help="Re-entrenar el modelo completo con la mejor configuración.")
+    args = parser.parse_args()
+    ajustar(minutos=args.minutos, procesos=args.procesos, entrenar=args.entrenar)
@@ -0,0 +1,124 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+from datetime import date, timedelta
+from sqlalchemy import text
+from src.database.db_manager import GestorBaseDatos
+from src.database.conexion import liberar_registro
+from src.database.migraciones import MIGRACIONES, aplicar_migraciones
+
+DEPTOS = ["Antioquia", "Bogotá D.C.", "Valle del Cauca", "Santander", "Cundinamarca",
+          "Cauca", "Nariño", "Meta", "Huila", "Tolima", "Bolívar", "Atlántico"]
+TIPOS = ["Obra", "Consultoría", "Suministros", "Prestación de servicios", "Compraventa", "Otro"]
+
+# Consulta de referencia de los loaders de ML: adiciones agregadas por proyecto
+SQL_JOIN_ADICIONES = """
+    SELECT p.id, SUM(a.valor_adicionado), SUM(a.tiempo_adicionado_dias)
+    FROM proyectos p JOIN adiciones a ON a.proyecto_id = p.id
+    WHERE p.departamento = 'Cauca'
+    GROUP BY p.id
+"""
+
+# Agregados del dashboard en SQL directo sobre proyectos: los métodos del gestor leen la
+# tabla resumen (que poblar() no llena) y pasan por el caché de consultas
+SQL_TOP_DEPARTAMENTOS = """
+    SELECT departamento, COUNT(*) FROM proyectos
+    WHERE departamento IS NOT NULL
+    GROUP BY departamento ORDER BY COUNT(*) DESC LIMIT 5
+"""
+SQL_TIPOS_CONTRATO = """
+    SELECT tipo_contrato, COUNT(*) FROM proyectos
+    GROUP BY tipo_contrato ORDER BY COUNT(*) DESC LIMIT 5
+"""
+
+def poblar(gestor, n, semilla=7):
+    """Llena la BD con n proyectos sintéticos (~30% con adiciones) vía executemany."""
+    rnd = random.Random(semilla)
+    base = date(2018, 1, 1)
+    proyectos, adiciones = [], []
+    for i in range(n):
+        inicio = base + timedelta(days=rnd.randint(0, 2000))
+        proyectos.append({
+            "id": f"SINT-{i}", "nombre_entidad": f"Entidad {rnd.randint(1, 2000)}",
+            "nombre_proyecto": f"Proyecto sintético {i}", "presupuesto_inicial": rnd.uniform(1e6, 5e9),
+            "fecha_inicio": inicio, "fecha_fin": inicio + timedelta(days=rnd.randint(30, 700)),
+            "departamento": rnd.choice(DEPTOS), "municipio": f"Municipio {rnd.randint(1, 300)}",
+            "tipo_contrato": rnd.choice(TIPOS), "es_prorrogable": rnd.random() < 0.5,
+        })
+        if rnd.random() < 0.3:
+            adiciones.append({"proyecto_id": f"SINT-{i}", "valor_adicionado": rnd.uniform(0, 1e8),
+                              "tiempo_adicionado_dias": rnd.choice([0, 30, 60])})
+    with gestor.engine.begin() as conexion:
+        conexion.execute(text(
+            "INSERT INTO proyectos (id, nombre_entidad, nombre_proyecto, presupuesto_inicial, fecha_inicio, "
+            "fecha_fin, departamento, municipio, tipo_contrato, es_prorrogable) VALUES (:id, :nombre_entidad, "
+            ":nombre_proyecto, :presupuesto_inicial, :fecha_inicio, :fecha_fin, :departamento, :municipio, "
+            ":tipo_contrato, :es_prorrogable)"), proyectos)
+        conexion.execute(text(
+            "INSERT INTO adiciones (proyecto_id, valor_adicionado, tiempo_adicionado_dias) "
+            "VALUES (:proyecto_id, :valor_adicionado, :tiempo_adicionado_dias)"), adiciones)
+
+def _cronometrar(funcion, repeticiones):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor * 1000
+
+def medir_consultas(gestor, repeticiones):
+    def consulta(sql):
+        def ejecutar():
+            with gestor.engine.connect() as conexion:
+                conexion.execute(text(sql)).all()
+        return ejecutar
+
+    return {
+        "GROUP BY departamento": _cronometrar(consulta(SQL_TOP_DEPARTAMENTOS), repeticiones),
+        "GROUP BY tipo_contrato": _cronometrar(consulta(SQL_TIPOS_CONTRATO), repeticiones),
+        "Página de 1000 (fecha_inicio, id)": _cronometrar(lambda: gestor.obtener_pagina_proyectos(tamano=1000), repeticiones),
+        "Página de 1000 filtrada (depto)": _cronometrar(
+            lambda: gestor.obtener_pagina_proyectos(tamano=1000, departamento="Cauca"), repeticiones),
+        "JOIN adiciones (ML)": _cronometrar(consulta(SQL_JOIN_ADICIONES), repeticiones),
+    }
+
+def benchmark(n=500_000, repeticiones=3):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench_indices.db')}"
+        gestor = GestorBaseDatos(url=url)
+        gestor.cache.max_bytes = 0 # Medir las consultas, no el caché de resultados
+
+        print(f"🏗️  Generando BD sintética con {n:,} proyectos...")
+        poblar(gestor, n)
+
+        # Simular una BD de usuario antigua: sin índices secundarios (tampoco el compuesto
+        # de la migración 3) y en versión 0
+        with gestor.engine.begin() as conexion:
+            for sql in MIGRACIONES[0][2] + MIGRACIONES[2][2]:
+                if not sql.startswith("CREATE INDEX"):
+                    continue
+                nombre = sql.split("EXISTS ")[1].split(" ON")[0]
+                conexion.exec_driver_sql(f"DROP INDEX IF EXISTS {nombre}")
+            conexion.exec_driver_sql("PRAGMA user_version = 0")
+
+        antes = medir_consultas(gestor, repeticiones)
+        inicio = time.perf_counter()
+        aplicar_migraciones(gestor.engine)
+        print(f"   (migración en sitio: {time.perf_counter() - inicio:.1f}s)")
+        despues = medir_consultas(gestor, repeticiones)
+
+        liberar_registro(url)
+
+    print(f"\n{'Consulta':<36}{'Antes (ms)':>12}{'Después (ms)':>14}{'x':>7}")
+    for consulta in antes:
+        a, d = antes[consulta], despues[consulta]
+        print(f"{consulta:<36}{a:>12.1f}{d:>14.1f}{a / d if d else 0:>7.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempos de consultas del dashboard/ML antes y después de los índices.")
+    parser.add_argument("--filas", type=int, default=500_000, help="Proyectos sintéticos.")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por consulta (se toma la mejor).")
+    args = parser.parse_args()
+    benchmark(args.filas, args.repeticiones)
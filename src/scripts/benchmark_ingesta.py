@@ -0,0 +1,164 @@
+import os
+import time
+import random
+import argparse
+import tempfile
+import pandas as pd
+import numpy as np
+from datetime import date, datetime
+from src.services.secop_api import ClienteSecop
+from src.database.db_manager import GestorBaseDatos
+from src.database.conexion import liberar_registro
+from src.database.models import Proyecto, Adicion, DatosFinancieros
+
+def generar_registros(n, semilla=42, prefijo="BENCH"):
+    """Registros sintéticos con la forma de la respuesta JSON de SECOP II."""
+    rnd = random.Random(semilla)
+    deptos = ["Antioquia", "Bogotá D.C.", "Valle del Cauca", "Santander", "Cundinamarca", "Cauca"]
+    tipos = ["Obra", "Consultoría", "Suministros", "Prestación de servicios", "Compraventa"]
+    registros = []
+    for i in range(n):
+        anio = rnd.randint(2020, 2023)
+        registros.append({
+            'referencia_del_contrato': f"{prefijo}-{i}",
+            'nombre_entidad': f"Entidad {rnd.randint(1, 500)}",
+            'objeto_del_contrato': f"Contrato de {rnd.choice(tipos).lower()} número {i}",
+            'valor_del_contrato': str(rnd.randint(1_000_000, 5_000_000_000)),
+            'fecha_de_firma': f"{anio}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T00:00:00.000",
+            'fecha_de_inicio_del_contrato': f"{anio}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T00:00:00.000",
+            'fecha_de_fin_del_contrato': f"{anio + 1}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T00:00:00.000",
+            'departamento': rnd.choice(deptos),
+            'ciudad': f"Municipio {rnd.randint(1, 100)}",
+            'tipo_de_contrato': rnd.choice(tipos),
+            'el_contrato_puede_ser_prorrogado': rnd.choice(["Si", "No"]),
+            'valor_total_de_adiciones': str(rnd.choice([0, 0, 0, rnd.randint(1, 100_000_000)])),
+            'dias_adicionados': str(rnd.choice([0, 0, 30, 60])),
+            'presupuesto_general_de_la_nacion_pgn': str(rnd.choice([0, rnd.randint(1, 10**8)])),
+            'recursos_propios': str(rnd.choice([0, rnd.randint(1, 10**7)])),
+        })
+    return registros
+
+def _guardar_orm_fila_a_fila(gestor, df):
+    """
+    Ruta ORM original de guardar_dataframe (iterrows + un objeto ORM por fila),
+    conservada aquí solo como línea base del benchmark.
+    """
+    df = df.drop_duplicates(subset=['referencia_del_contrato'], keep='first')
+    df = df.replace({np.nan: None})
+    session = gestor.obtener_sesion()
+    try:
+        contador_nuevos = 0
+        ids_existentes = {res[0] for res in session.query(Proyecto.id).all()}
+
+        for _, row in df.iterrows():
+            contrato_id = str(row.get('referencia_del_contrato', ''))
+            if not contrato_id or contrato_id == 'None' or contrato_id == 'nan':
+                continue
+            if contrato_id in ids_existentes:
+                continue
+
+            def clean_float(val):
+                if val is None: return 0.0
+                try: return float(val)
+                except: return 0.0
+
+            def clean_int(val):
+                if val is None: return 0
+                try: return int(float(val))
+                except: return 0
+
+            def clean_date(val):
+                if pd.isna(val): return None
+                if isinstance(val, (date, datetime)):
+                    return val if isinstance(val, date) and not isinstance(val, datetime) else val.date()
+                try:
+                    if hasattr(val, 'to_pydatetime'):
+                        return val.to_pydatetime().date()
+                    if isinstance(val, str):
+                        return datetime.fromisoformat(val.replace('T', ' ').split('.')[0]).date()
+                except: pass
+                return None
+
+            def clean_bool(val):
+                if val is None: return False
+                if isinstance(val, str):
+                    return val.lower() in ['si', 'sí', 'true', 'yes']
+                return bool(val)
+
+            session.add(Proyecto(
+                id=contrato_id,
+                nombre_entidad=row.get('nombre_entidad'),
+                nombre_proyecto=row.get('objeto_del_contrato') or "No definido",
+                presupuesto_inicial=clean_float(row.get('valor_del_contrato')),
+                fecha_inicio=clean_date(row.get('fecha_de_inicio_del_contrato')),
+                fecha_fin=clean_date(row.get('fecha_de_fin_del_contrato')),
+                departamento=row.get('departamento'),
+                municipio=row.get('ciudad'),
+                tipo_contrato=row.get('tipo_de_contrato'),
+                es_prorrogable=clean_bool(row.get('el_contrato_puede_ser_prorrogado')),
+                fecha_ultima_prorroga=clean_date(row.get('fecha_de_notificaci_n_de_prorrogaci_n'))
+            ))
+
+            val_adiciones = clean_float(row.get('valor_total_de_adiciones'))
+            dias_adicionados = clean_int(row.get('dias_adicionados'))
+            if val_adiciones > 0 or dias_adicionados > 0:
+                session.add(Adicion(
+                    proyecto_id=contrato_id,
+                    fecha=clean_date(row.get('fecha_de_firma')),
+                    valor_adicionado=val_adiciones,
+                    tiempo_adicionado_dias=dias_adicionados,
+                    descripcion="Modificaciones reportadas en SECOP"
+                ))
+
+            pgn = clean_float(row.get('presupuesto_general_de_la_nacion_pgn'))
+            sgp = clean_float(row.get('sistema_general_de_participaciones'))
+            regalias = clean_float(row.get('sistema_general_de_regal_as'))
+            credito = clean_float(row.get('recursos_de_credito'))
+            rec_propios = clean_float(row.get('recursos_propios')) + \
+                          clean_float(row.get('recursos_propios_alcald_as_gobernaciones_y_resguardos_ind_genas_'))
+            if pgn > 0 or sgp > 0 or regalias > 0 or credito > 0 or rec_propios > 0:
+                session.add(DatosFinancieros(
+                    proyecto_id=contrato_id, pgn=pgn, sgp=sgp, regalias=regalias,
+                    recursos_credito=credito, recursos_propios=rec_propios
+                ))
+
+            contador_nuevos += 1
+
+        session.commit()
+        return contador_nuevos
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+def _medir(nombre, guardar, lotes):
+    """Ingresa los lotes en una BD temporal nueva y devuelve filas/seg."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        gestor = GestorBaseDatos(url=url)
+        inicio = time.perf_counter()
+        total = sum(guardar(gestor, df) for df in lotes)
+        segundos = time.perf_counter() - inicio
+        liberar_registro(url)
+    tasa = total / segundos if segundos > 0 else 0.0
+    print(f"   • {nombre:<12} {total:>8} filas en {segundos:6.2f}s -> {tasa:>10,.0f} filas/s")
+    return tasa
+
+def benchmark(filas_por_lote=10000, lotes=3):
+    print(f"⏱️  Benchmark de ingesta: {lotes} lotes x {filas_por_lote} filas")
+    cliente = ClienteSecop()
+    dfs = [cliente.convertir_a_dataframe(generar_registros(filas_por_lote, semilla=i, prefijo=f"L{i}"))
+           for i in range(lotes)]
+
+    tasa_orm = _medir("ORM", _guardar_orm_fila_a_fila, dfs)
+    tasa_bulk = _medir("Bulk (Core)", lambda g, df: g.guardar_dataframe(df), dfs)
+    if tasa_orm > 0:
+        print(f"   ⚡ Aceleración: x{tasa_bulk / tasa_orm:.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara filas/seg de la ruta ORM vs la inserción masiva.")
+    parser.add_argument("--filas", type=int, default=10000, help="Filas por lote.")
+    parser.add_argument("--lotes", type=int, default=3, help="Número de lotes.")
+    args = parser.parse_args()
+    benchmark(args.filas, args.lotes)
@@ -0,0 +1,68 @@
+import time
+import random
+import argparse
+import warnings
+import numpy as np
+import pandas as pd
+from src.services.ml_engine import MotorIA
+
+DEPTOS = ["Antioquia", "Bogotá D.C.", "Valle del Cauca", "Santander", "Cundinamarca", "Cauca", "Nariño"]
+TIPOS = ["Obra", "Consultoría", "Suministros", "Prestación de servicios", "Compraventa"]
+
+def _entradas(n, distintas, semilla=7):
+    """n entradas del simulador tomadas de un conjunto de `distintas` combinaciones."""
+    rnd = random.Random(semilla)
+    base = [(rnd.uniform(1e6, 5e9), rnd.randint(30, 700), rnd.choice(DEPTOS), rnd.choice(TIPOS))
+            for _ in range(distintas)]
+    return [rnd.choice(base) for _ in range(n)]
+
+def _medir(funcion, entradas):
+    """Latencia por llamada en milisegundos: (mediana, p99)."""
+    tiempos = []
+    for entrada in entradas:
+        inicio = time.perf_counter()
+        funcion(*entrada)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return float(np.median(tiempos)), float(np.percentile(tiempos, 99))
+
+def benchmark(n=2000, distintas=200):
+    motor = MotorIA()
+    motor._asegurar_cargado() # El motor carga el modelo en el primer uso; el benchmark mide solo la predicción
+    if not motor.entrenado:
+        print("❌ No hay un modelo entrenado (python -m src.scripts.entrenar_modelo).")
+        return
+
+    # Referencia: el camino anterior (DataFrame de una fila + predict_proba + predict del bosque)
+    def camino_dataframe(presupuesto, duracion, departamento, tipo):
+        fila = pd.DataFrame([{
+            'presupuesto': presupuesto, 'duracion_estimada': duracion,
+            'depto_encoded': motor.cleaner.codificar('departamento', departamento),
+            'tipo_encoded': motor.cleaner.codificar('tipo_contrato', tipo),
+            'entidad_freq': 0.01,
+        }])[motor.feature_names]
+        motor.model.predict_proba(fila)
+        motor.model.predict(fila)
+
+    def camino_rapido_sin_cache(presupuesto, duracion, departamento, tipo):
+        motor._probabilidad_cacheada.cache_clear()
+        motor.predecir_riesgo(presupuesto, duracion, departamento, tipo)
+
+    print(f"⏱️  Predicción individual ({len(motor.model.estimators_)} árboles, {n} llamadas, {distintas} entradas distintas)")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        resultados = [
+            ("DataFrame + predict_proba + predict", _medir(camino_dataframe, _entradas(n // 10, distintas))),
+            ("Fila preasignada + predict_proba", _medir(camino_rapido_sin_cache, _entradas(n, distintas))),
+            ("Fila preasignada + caché LRU", _medir(motor.predecir_riesgo, _entradas(n, distintas))),
+        ]
+    for nombre, (mediana, p99) in resultados:
+        print(f"   {nombre:<38} mediana {mediana:8.3f} ms   p99 {p99:8.3f} ms")
+    info = motor._probabilidad_cacheada.cache_info()
+    print(f"   Caché: {info.hits} aciertos, {info.misses} fallos")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia de MotorIA.predecir_riesgo.")
+    parser.add_argument("-n", type=int, default=2000, help="Llamadas por escenario.")
+    parser.add_argument("--distintas", type=int, default=200, help="Combinaciones de entrada distintas.")
+    args = parser.parse_args()
+    benchmark(args.n, args.distintas)
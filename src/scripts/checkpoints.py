@@ -0,0 +1,104 @@
+import os
+import json
+from datetime import datetime
+
+
+class DiarioCheckpoints:
+    """
+    Diario append-only (JSON Lines) de la ingesta por trozos.
+    Cada línea registra un trozo (departamento, año, offset) guardado en la BD,
+    un fallo, o el cierre de un tramo (departamento, año) completo.
+    Permite reanudar un seed interrumpido sin repetir trabajo ya hecho.
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._tramos = {}
+
+    def reiniciar(self):
+        """Empieza un diario nuevo (ingesta desde cero)."""
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        open(self.ruta, "w", encoding="utf-8").close()
+        self._tramos = {}
+
+    def cargar(self):
+        """Reconstruye el estado de cada tramo a partir del diario en disco."""
+        self._tramos = {}
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    self._aplicar(json.loads(linea))
+                except ValueError:
+                    # Última línea a medio escribir (el proceso murió escribiendo)
+                    continue
+
+    def _tramo(self, depto, anio):
+        return self._tramos.setdefault((depto, anio), {"completo": False, "offsets": {}, "fallos": {}, "marca": None})
+
+    def _aplicar(self, registro):
+        tramo = self._tramo(registro["departamento"], registro["anio"])
+        estado = registro["estado"]
+        if estado == "ok":
+            tramo["offsets"][registro["offset"]] = registro["tamano"]
+            tramo["fallos"].pop(registro["offset"], None)
+            if registro.get("marca") and (tramo["marca"] is None or registro["marca"] > tramo["marca"]):
+                tramo["marca"] = registro["marca"]
+        elif estado == "fallido":
+            tramo["fallos"][registro["offset"]] = registro["error"]
+        elif estado == "tramo_completo":
+            tramo["completo"] = True
+            tramo["fallos"].clear()
+
+    def _escribir(self, registro):
+        registro["momento"] = datetime.now().isoformat(timespec="seconds")
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._aplicar(registro)
+
+    def registrar_trozo(self, depto, anio, offset, tamano, filas, nuevos, marca=None):
+        """`marca`: :updated_at más reciente del trozo (para las marcas de agua)."""
+        self._escribir({"estado": "ok", "departamento": depto, "anio": anio,
+                        "offset": offset, "tamano": tamano, "filas": filas, "nuevos": nuevos,
+                        "marca": marca.isoformat() if marca else None})
+
+    def registrar_fallo(self, depto, anio, offset, error):
+        self._escribir({"estado": "fallido", "departamento": depto, "anio": anio,
+                        "offset": offset, "error": str(error)})
+
+    def registrar_tramo_completo(self, depto, anio):
+        self._escribir({"estado": "tramo_completo", "departamento": depto, "anio": anio})
+
+    def tramo_completo(self, depto, anio):
+        return self._tramos.get((depto, anio), {}).get("completo", False)
+
+    def offset_reanudacion(self, depto, anio):
+        """Primer offset del tramo que no tiene un trozo guardado (los anteriores son contiguos)."""
+        offsets = self._tramos.get((depto, anio), {}).get("offsets", {})
+        offset = 0
+        while offset in offsets:
+            offset += offsets[offset]
+        return offset
+
+    def marcas_agua(self, tramos):
+        """{departamento: :updated_at máximo} de los departamentos con todos sus tramos completos."""
+        por_depto = {}
+        for depto, anio in tramos:
+            por_depto.setdefault(depto, []).append(self._tramos.get((depto, anio)))
+
+        marcas = {}
+        for depto, estados in por_depto.items():
+            if not all(e and e["completo"] for e in estados):
+                continue
+            fechas = [e["marca"] for e in estados if e["marca"]]
+            if fechas:
+                marcas[depto] = datetime.fromisoformat(max(fechas))
+        return marcas
+
+    def fallos_pendientes(self):
+        """[(departamento, año, offset, error)] de los fallos que no se han recuperado."""
+        return [(depto, anio, offset, error)
+                for (depto, anio), tramo in self._tramos.items()
+                for offset, error in sorted(tramo["fallos"].items())]
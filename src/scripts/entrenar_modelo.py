@@ -0,0 +1,39 @@
+import argparse
+from src.database.escritor import cerrar_escritores
+from src.services.almacen_modelos import migrar_modelo_legado
+from src.services.ml_engine import MotorIA
+
+# Re-entrenamiento programable después de cada sincronización, p. ej.:
+#   python -m src.scripts.sync_incremental && python -m src.scripts.entrenar_modelo
+
+def entrenar(modo="auto", puntuar=True):
+    motor = MotorIA()
+    res = motor.entrenar(modo=modo)
+    if "error" in res:
+        print(f"❌ {res['error']}")
+        return res
+
+    print(f"   Modo: {res['modo']} ({res['motivo']})")
+    print(f"   Árboles: {res['arboles']} · filas ajustadas: {res['filas_ajuste']:,} · n_jobs: {res['n_jobs']}")
+    print(f"   ⏱️  Carga {res['segundos_carga']:.1f}s · ajuste {res['segundos_entrenamiento']:.1f}s · total {res['segundos_total']:.1f}s")
+    for modo_previo, segundos in res["tiempos_por_modo"].items():
+        print(f"      último ajuste {modo_previo}: {segundos:.1f}s")
+
+    if puntuar:
+        puntaje = motor.puntuar_portafolio()
+        if "error" in puntaje:
+            print(f"❌ {puntaje['error']}")
+    return res
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrena el modelo de riesgo (completo o incremental con warm_start).")
+    parser.add_argument("--modo", choices=["auto", "completo", "incremental"], default="auto",
+                        help="auto: incremental salvo que la política pida reconstruir (por defecto).")
+    parser.add_argument("--sin-puntuar", action="store_true",
+                        help="No recalcular los puntajes de riesgo de los proyectos después de entrenar.")
+    args = parser.parse_args()
+    migrar_modelo_legado() # El modo incremental puede partir del modelo legado
+    try:
+        entrenar(modo=args.modo, puntuar=not args.sin_puntuar)
+    finally:
+        cerrar_escritores()
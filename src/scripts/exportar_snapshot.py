@@ -0,0 +1,13 @@
+import os
+import time
+from src.services.snapshot import exportar_snapshot
+
+def exportar():
+    print("📦 Exportando snapshot columnar de proyectos...")
+    inicio = time.time()
+    ruta = exportar_snapshot()
+    tamano_mb = os.path.getsize(ruta) / (1024 * 1024)
+    print(f"✅ {ruta} ({tamano_mb:.1f} MB) en {time.time() - inicio:.1f}s")
+
+if __name__ == "__main__":
+    exportar()
@@ -0,0 +1,52 @@
+import argparse
+from src.database.db_manager import GestorBaseDatos
+
+# Programable (cron / Programador de tareas), p. ej. semanal:
+#   python -m src.scripts.mantenimiento_db
+
+def _mb(bytes_):
+    return "-" if bytes_ is None else f"{bytes_ / (1024 * 1024):,.1f}"
+
+def mantenimiento(vacuum=True, vacuum_completo=False, integridad=True, rapido=False):
+    print("🧹 Mantenimiento de la base de datos...")
+    gestor = GestorBaseDatos()
+    res = gestor.mantenimiento(vacuum=vacuum, vacuum_completo=vacuum_completo,
+                               integridad=integridad, rapido=rapido)
+
+    print(f"   📈 ANALYZE + optimize en {res['segundos_analyze']:.1f}s")
+
+    if vacuum:
+        liberadas = res["paginas_antes"] - res["paginas_despues"]
+        print(f"   🗜️  Vacuum en {res['segundos_vacuum']:.1f}s: {res['paginas_antes']:,} -> {res['paginas_despues']:,} páginas "
+              f"({_mb(liberadas * res['tamano_pagina'])} MB liberados)")
+
+    if integridad:
+        problemas = res["problemas_integridad"]
+        if problemas:
+            print(f"   ❌ Integridad: {len(problemas)} problemas ({res['segundos_integridad']:.1f}s)")
+            for problema in problemas[:20]:
+                print(f"      • {problema}")
+        else:
+            print(f"   ✅ Integridad OK ({res['segundos_integridad']:.1f}s)")
+
+    print(f"\n{'Objeto':<40}{'Tipo':<7}{'Filas':>12}{'Páginas':>10}{'MB':>9}{'% sin uso':>11}")
+    total = 0
+    for nombre, tipo, tabla, filas, paginas, bytes_, sin_uso in res["tamanos"]:
+        total += bytes_ or 0
+        etiqueta = nombre if tipo == "table" else f"  {nombre}"
+        filas_txt = "-" if filas is None else f"{filas:,}"
+        paginas_txt = "-" if paginas is None else f"{paginas:,}"
+        sin_uso_txt = f"{100 * sin_uso / bytes_:.0f}%" if bytes_ else "-"
+        print(f"{etiqueta[:39]:<40}{tipo:<7}{filas_txt:>12}{paginas_txt:>10}{_mb(bytes_):>9}{sin_uso_txt:>11}")
+    print(f"{'TOTAL':<40}{'':<7}{'':>12}{'':>10}{_mb(total):>9}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ANALYZE, vacuum, chequeo de integridad y reporte de tamaños de la BD.")
+    parser.add_argument("--sin-vacuum", action="store_true", help="No liberar espacio (solo estadísticas y reporte).")
+    parser.add_argument("--vacuum-completo", action="store_true",
+                        help="VACUUM completo (reescribe y desfragmenta todo el archivo; más lento).")
+    parser.add_argument("--sin-integridad", action="store_true", help="Omitir el chequeo de integridad.")
+    parser.add_argument("--rapido", action="store_true", help="quick_check en vez de integrity_check.")
+    args = parser.parse_args()
+    mantenimiento(vacuum=not args.sin_vacuum, vacuum_completo=args.vacuum_completo,
+                  integridad=not args.sin_integridad, rapido=args.rapido)
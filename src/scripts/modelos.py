@@ -0,0 +1,62 @@
+import argparse
+from src.services import almacen_modelos
+from src.services.ml_engine import MotorIA
+
+# Administración del almacén de modelos (data/modelos), p. ej.:
+#   python -m src.scripts.modelos listar
+#   python -m src.scripts.modelos revertir
+
+def _marca_bd(marca_datos):
+    """[identidad, generación] abreviado: últimos 6 dígitos hex de la identidad de la BD y la generación."""
+    if not marca_datos:
+        return "-"
+    identidad, generacion = marca_datos
+    return f"{identidad:x}"[-6:] + f"/g{generacion}"
+
+def listar():
+    activa = almacen_modelos.version_activa()
+    versiones = almacen_modelos.listar_versiones()
+    if not versiones:
+        print("📭 No hay modelos guardados.")
+        return
+    print(f"{'':<2}{'Versión':<26}{'Creado':<21}{'Modo':<13}{'Árboles':>8}{'Filas':>10}"
+          f"{'Rowid':>10}{'BD':>14}{'Firmas hasta':>14}{'Precisión':>11}")
+    for m in versiones:
+        marca = "▶" if m["version"] == activa else ""
+        precision = "-" if m.get("precision") is None else f"{m['precision']:.2%}"
+        filas = "-" if m.get("filas_entrenamiento") is None else f"{m['filas_entrenamiento']:,}"
+        firmas = (m.get("marca_agua_ingesta") or "-")[:10]
+        print(f"{marca:<2}{m['version']:<26}{m['creado']:<21}{m.get('modo') or '-':<13}{m.get('arboles') or 0:>8}"
+              f"{filas:>10}{m.get('ultimo_id_entrenado') or '-':>10}{_marca_bd(m.get('marca_datos')):>14}"
+              f"{firmas:>14}{precision:>11}")
+
+def activar(version):
+    MotorIA().activar_version(version)
+    print(f"✅ Versión activa: {version}")
+
+def revertir():
+    version = MotorIA().revertir_version()
+    if version is None:
+        print("⚠️ No hay una versión anterior a la activa.")
+    else:
+        print(f"⏪ Versión activa: {version}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Versiones guardadas del modelo de riesgo.")
+    sub = parser.add_subparsers(dest="accion", required=True)
+    sub.add_parser("listar", help="Versiones guardadas con sus metadatos (▶ = activa).")
+    p_activar = sub.add_parser("activar", help="Activar una versión sin re-entrenar.")
+    p_activar.add_argument("version")
+    sub.add_parser("revertir", help="Volver a la versión anterior a la activa.")
+    p_importar = sub.add_parser("importar", help="Importar un modelo_entrenado.pkl de versiones anteriores.")
+    p_importar.add_argument("ruta", nargs="?", default=almacen_modelos.RUTA_MODELO_LEGADO)
+    args = parser.parse_args()
+
+    if args.accion == "listar":
+        listar()
+    elif args.accion == "activar":
+        activar(args.version)
+    elif args.accion == "revertir":
+        revertir()
+    else:
+        print(f"✅ Importada como versión {almacen_modelos.importar_modelo_legado(args.ruta)}")
@@ -0,0 +1,18 @@
+import time
+from src.database.db_manager import GestorBaseDatos
+
+def reconstruir():
+    print("🧮 Reconstruyendo tabla de agregados del dashboard...")
+    inicio = time.time()
+    gestor = GestorBaseDatos()
+    gestor.reconstruir_resumenes()
+    total, suma = gestor.obtener_kpis_globales()
+    print(f"✅ Listo en {time.time() - inicio:.1f}s: {total:,} proyectos, ${suma:,.0f} en presupuesto.")
+
+    print("🔎 Reconstruyendo índice de búsqueda de texto...")
+    inicio = time.time()
+    gestor.reconstruir_indice_texto()
+    print(f"✅ Listo en {time.time() - inicio:.1f}s.")
+
+if __name__ == "__main__":
+    reconstruir()
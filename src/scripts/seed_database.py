@@ -1,94 +1,218 @@
-import sys
 import os
 import time
-import random
-from datetime import datetime
-from src.services.secop_api import ClienteSecop
-from src.database.db_manager import GestorBaseDatos
-
-# Lista completa de departamentos de Colombia (normalizada para SECOP)
-DEPARTAMENTOS_COLOMBIA = [
-    "Amazonas", "Antioquia", "Arauca", "Atlántico", "Bolívar", 
-    "Boyacá", "Caldas", "Caquetá", "Casanare", "Cauca", 
-    "Cesar", "Chocó", "Córdoba", "Cundinamarca", "Bogotá D.C.", 
-    "Guainía", "Guaviare", "Huila", "La Guajira", "Magdalena", 
-    "Meta", "Nariño", "Norte de Santander", "Putumayo", "Quindío", 
-    "Risaralda", "San Andrés, Providencia y Santa Catalina", "Santander", 
-    "Sucre", "Tolima", "Valle del Cauca", "Vaupés", "Vichada"
-]
+import queue
+import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.services.secop_api import ClienteSecop, DATASET_ID_SECOP_II, TAMANO_PAGINA, maxima_actualizacion
+from src.database.db_manager import GestorBaseDatos, RUTA_DB, URL_DATABASE
+from src.database.conexion import liberar_registro
+from src.database.escritor import obtener_escritor, cerrar_escritores
+from src.scripts.checkpoints import DiarioCheckpoints
+from src.services.normalizacion import DEPARTAMENTOS_COLOMBIA
+
+# Diario de trozos completados (permite --resume tras una interrupción)
+RUTA_DIARIO = os.path.join("data", "seed_checkpoints.jsonl")
 
 def borrar_base_datos():
-    """Elimina el archivo de base de datos si existe."""
-    ruta_db = os.path.join("data", "base_datos_app.db")
+    """Elimina el archivo de base de datos (y sus archivos WAL/SHM) si existe."""
+    ruta_db = RUTA_DB
     if os.path.exists(ruta_db):
         try:
-            os.remove(ruta_db)
+            liberar_registro(URL_DATABASE)
+            for ruta in (ruta_db, f"{ruta_db}-wal", f"{ruta_db}-shm"):
+                if os.path.exists(ruta):
+                    os.remove(ruta)
             print("🗑️  Base de datos antigua eliminada con éxito.")
         except Exception as e:
             print(f"⚠️  No se pudo borrar la BD: {e}")
     else:
         print("ℹ️  No existía base de datos previa.")
 
-def seed_database():
-    print("🚀 Iniciando RE-INGESTA TOTAL de Datos SECOP...")
-    
-    # 1. Borrar BD antigua para empezar limpio
-    borrar_base_datos()
+class EstadisticasWorkers:
+    """Acumula filas descargadas y tiempo activo por hilo de descarga."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.por_worker = {}
+
+    def registrar(self, nombre, filas, segundos):
+        with self._lock:
+            acum = self.por_worker.setdefault(nombre, [0, 0.0])
+            acum[0] += filas
+            acum[1] += segundos
+
+    def imprimir_resumen(self):
+        print("⚙️  Rendimiento por worker:")
+        for nombre, (filas, segundos) in sorted(self.por_worker.items()):
+            tasa = filas / segundos if segundos > 0 else 0.0
+            print(f"   • {nombre}: {filas} filas en {segundos:.1f}s ({tasa:,.0f} filas/s)")
+
+_locales = threading.local()
+
+def _cliente_del_hilo():
+    """Un ClienteSecop por hilo (sodapy no es thread-safe); todos comparten el limitador global."""
+    if not hasattr(_locales, "cliente"):
+        _locales.cliente = ClienteSecop()
+    return _locales.cliente
+
+def _encolar(cola, item, detener):
+    """put() que se rinde si el escritor abortó (evita hilos colgados con la cola llena)."""
+    while not detener.is_set():
+        try:
+            cola.put(item, timeout=0.5)
+            return
+        except queue.Full:
+            continue
+
+def _descargar_tramo(depto, anio, offset_inicial, cola, estadisticas, detener):
+    """
+    Descarga un (departamento, año) desde `offset_inicial` y encola sus páginas
+    (con su offset) para el escritor. Siempre termina encolando un marcador
+    (df=None) con el error y el offset donde falló, si lo hubo.
+    """
+    nombre = threading.current_thread().name
+    inicio = time.time()
+    filas = 0
+    error = None
+    offset = offset_inicial
+    try:
+        for df in _cliente_del_hilo().iterar_contratos(departamento=depto, year=anio,
+                                                       tamano_pagina=TAMANO_PAGINA,
+                                                       offset_inicial=offset_inicial):
+            if detener.is_set():
+                return
+            filas += len(df)
+            _encolar(cola, (depto, anio, offset, df, None), detener)
+            offset += TAMANO_PAGINA
+    except Exception as e:
+        error = e
+    finally:
+        estadisticas.registrar(nombre, filas, time.time() - inicio)
+        _encolar(cola, (depto, anio, offset, None, error), detener)
+
+def seed_database(workers=1, reanudar=False):
+    diario = DiarioCheckpoints(RUTA_DIARIO)
+
+    if reanudar:
+        print("⏯️  Reanudando ingesta de Datos SECOP desde el último checkpoint...")
+        diario.cargar()
+    else:
+        print("🚀 Iniciando RE-INGESTA TOTAL de Datos SECOP...")
+        # 1. Borrar BD antigua para empezar limpio
+        borrar_base_datos()
+        diario.reiniciar()
     
     # 2. Inicializar gestor (esto crea las tablas vacías de nuevo)
-    cliente = ClienteSecop()
     gestor = GestorBaseDatos()
     
     # Años a consultar (Ventana histórica relevante)
     anios = [2020, 2021, 2022, 2023]
+    tramos = [(depto, anio) for depto in DEPARTAMENTOS_COLOMBIA for anio in anios]
+    pendientes = [(depto, anio) for depto, anio in tramos if not diario.tramo_completo(depto, anio)]
+    if reanudar:
+        print(f"⏭️  {len(tramos) - len(pendientes)} tramos ya completos, {len(pendientes)} pendientes.")
     
     total_descargados = 0
     errores = 0
+    nuevos_por_tramo = {}
+    tramos_con_fallo = set()
+    estadisticas = EstadisticasWorkers()
     
     start_time = time.time()
 
-    print(f"🌎 Consultando {len(DEPARTAMENTOS_COLOMBIA)} departamentos por {len(anios)} años...")
+    print(f"🌎 Consultando {len(DEPARTAMENTOS_COLOMBIA)} departamentos por {len(anios)} años con {workers} workers...")
+
+    # Cola acotada: si la BD va más lenta que la red, los workers esperan (memoria plana)
+    cola = queue.Queue(maxsize=workers * 2)
+
+    # Las escrituras las hace el escritor único de la BD; aquí se confirman en orden
+    # (al diario) a medida que sus futures terminan
+    escritor = obtener_escritor()
+    escrituras = deque() # (depto, anio, offset, filas, marca, futuro)
 
-    for depto in DEPARTAMENTOS_COLOMBIA:
-        print(f"\n📍 DEPARTAMENTO: {depto.upper()}")
-        
-        for anio in anios:
+    def confirmar_escrituras(esperar):
+        """Registra en el diario los trozos ya guardados (todos los pendientes si esperar=True)."""
+        nonlocal total_descargados, errores
+        while escrituras and (esperar or escrituras[0][5].done()):
+            depto, anio, offset, filas, marca, futuro = escrituras.popleft()
             try:
-                print(f"   📅 Año {anio}...", end=" ")
-                
-                # Descargar lote
-                resultados = cliente.obtener_contratos(
-                    departamento=depto,
-                    limite=10000, # Lote grande
-                    year=anio
-                )
-                
-                if not resultados:
-                    print("⚠️  (0 encontrados)")
-                    continue
-                
-                df = cliente.convertir_a_dataframe(resultados)
-                
-                # Guardar
-                nuevos = gestor.guardar_dataframe(df)
-                total_descargados += nuevos
-                
-                print(f"✅ (+{nuevos} contratos)")
-                
-                # Pausa anti-bloqueo
-                time.sleep(1.0) 
-                
+                nuevos = futuro.result()
             except Exception as e:
-                print(f"\n   ❌ Error: {e}")
+                print(f"   ❌ {depto} {anio}: Error guardando offset {offset}: {e}")
                 errores += 1
-                time.sleep(2)
+                tramos_con_fallo.add((depto, anio))
+                diario.registrar_fallo(depto, anio, offset, e)
+                continue
+            diario.registrar_trozo(depto, anio, offset, TAMANO_PAGINA, filas, nuevos, marca=marca)
+            nuevos_por_tramo[(depto, anio)] = nuevos_por_tramo.get((depto, anio), 0) + nuevos
+            total_descargados += nuevos
+
+    detener = threading.Event()
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="descarga")
+    try:
+        for depto, anio in pendientes:
+            pool.submit(_descargar_tramo, depto, anio, diario.offset_reanudacion(depto, anio),
+                        cola, estadisticas, detener)
+
+        # 3. Este hilo coordina: entrega las páginas al escritor y lleva el diario
+        restantes = len(pendientes)
+        while restantes:
+            depto, anio, offset, df, error = cola.get()
+
+            if df is not None:
+                escrituras.append((depto, anio, offset, len(df), maxima_actualizacion(df), escritor.enviar(df)))
+                confirmar_escrituras(esperar=False)
+                continue
+
+            # Marcador de fin de tramo: sus trozos deben estar guardados antes de cerrarlo
+            confirmar_escrituras(esperar=True)
+            restantes -= 1
+            if error is not None:
+                print(f"   ❌ {depto} {anio}: Error en offset {offset}: {error}")
+                errores += 1
+                diario.registrar_fallo(depto, anio, offset, error)
+                continue
+            if (depto, anio) in tramos_con_fallo:
+                continue
+
+            diario.registrar_tramo_completo(depto, anio)
+            if (depto, anio) not in nuevos_por_tramo:
+                print(f"   ⚠️  {depto} {anio}: (0 encontrados)")
+            else:
+                print(f"   ✅ {depto} {anio}: (+{nuevos_por_tramo[(depto, anio)]} contratos)")
+    finally:
+        # Ctrl-C o fallo: liberar a los workers, descartar tramos pendientes
+        # y dejar en el diario lo que el escritor alcance a guardar
+        detener.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        confirmar_escrituras(esperar=True)
+        cerrar_escritores()
+
+    # 4. Marcas de agua para la sincronización incremental (solo departamentos completos)
+    for depto, marca in diario.marcas_agua(tramos).items():
+        gestor.actualizar_marca_agua(DATASET_ID_SECOP_II, depto, marca)
 
     duration = (time.time() - start_time) / 60
     print("\n" + "="*50)
     print(f"🏁 PROCESO FINALIZADO en {duration:.1f} minutos.")
-    print(f"📊 Total Contratos en BD: {total_descargados}")
+    print(f"📊 Contratos nuevos en BD: {total_descargados}")
     print(f"💀 Errores de conexión: {errores}")
+    estadisticas.imprimir_resumen()
+
+    fallos = diario.fallos_pendientes()
+    if fallos:
+        print(f"🔁 {len(fallos)} trozos fallidos quedaron en {RUTA_DIARIO}:")
+        for depto, anio, offset, error in fallos:
+            print(f"   • {depto} {anio} (offset {offset}): {error}")
+        print("   Ejecuta de nuevo con --resume para reintentarlos.")
     print("="*50)
 
 if __name__ == "__main__":
-    seed_database()
+    parser = argparse.ArgumentParser(description="Re-ingesta total de contratos SECOP II.")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Hilos de descarga concurrentes (el límite de tasa es global).")
+    parser.add_argument("--resume", action="store_true",
+                        help="No borrar la BD: saltar los trozos ya completados y reintentar los fallidos.")
+    args = parser.parse_args()
+    seed_database(workers=max(1, args.workers), reanudar=args.resume)
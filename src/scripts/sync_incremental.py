@@ -0,0 +1,84 @@
+import argparse
+import time
+from datetime import datetime
+from src.services.secop_api import ClienteSecop, DATASET_ID_SECOP_II, maxima_actualizacion
+from src.database.db_manager import GestorBaseDatos
+from src.database.escritor import obtener_escritor, cerrar_escritores
+from src.services.normalizacion import DEPARTAMENTOS_COLOMBIA
+
+# Si un departamento nunca se ha sincronizado, se arranca desde el inicio de la ventana histórica del seed
+FECHA_INICIAL_POR_DEFECTO = datetime(2020, 1, 1)
+
+def sincronizar(departamentos=None, desde_por_defecto=FECHA_INICIAL_POR_DEFECTO, refrescar_desde=None):
+    """
+    Sincronización incremental: por cada departamento pide a SECOP solo las filas
+    modificadas (:updated_at) desde su marca de agua, las fusiona con guardar_dataframe
+    en modo upsert (los contratos cuyo contenido cambió se reescriben) y avanza la marca.
+    Un departamento sin marca arranca con los contratos firmados desde `desde_por_defecto`.
+    refrescar_desde: ignora las marcas y vuelve a revisar los contratos firmados desde
+    esa fecha (p. ej. tras borrar la BD parcialmente).
+    """
+    print("🔄 Iniciando SINCRONIZACIÓN INCREMENTAL de Datos SECOP...")
+
+    cliente = ClienteSecop()
+    gestor = GestorBaseDatos()
+    escritor = obtener_escritor()
+    departamentos = departamentos or DEPARTAMENTOS_COLOMBIA
+
+    total_nuevos = 0
+    total_descargados = 0
+    errores = 0
+    start_time = time.time()
+
+    for depto in departamentos:
+        marca = None if refrescar_desde else gestor.obtener_marca_agua(DATASET_ID_SECOP_II, depto)
+        if marca:
+            filtro = {"actualizados_desde": marca}
+            print(f"   📍 {depto} (modificados desde {marca:%Y-%m-%d %H:%M})...", end=" ")
+        else:
+            filtro = {"desde": refrescar_desde or desde_por_defecto}
+            print(f"   📍 {depto} (firmados desde {filtro['desde']:%Y-%m-%d %H:%M})...", end=" ")
+
+        try:
+            descargados = 0
+            nueva_marca = None
+            escrituras = []
+            # La siguiente página se descarga mientras el escritor guarda la anterior
+            for df in cliente.iterar_contratos(departamento=depto, **filtro):
+                descargados += len(df)
+                escrituras.append(escritor.enviar(df, modo="upsert"))
+                fecha_lote = maxima_actualizacion(df)
+                if fecha_lote and (nueva_marca is None or fecha_lote > nueva_marca):
+                    nueva_marca = fecha_lote
+            nuevos = sum(futuro.result() for futuro in escrituras)
+
+            # La marca solo avanza cuando el departamento terminó completo (y quedó guardado)
+            gestor.actualizar_marca_agua(DATASET_ID_SECOP_II, depto, nueva_marca)
+            total_nuevos += nuevos
+            total_descargados += descargados
+            print(f"✅ ({descargados} descargados, +{nuevos} nuevos/actualizados)")
+
+        except Exception as e:
+            print(f"\n   ❌ Error: {e}")
+            errores += 1
+
+    cerrar_escritores()
+
+    duration = (time.time() - start_time) / 60
+    print("\n" + "="*50)
+    print(f"🏁 SINCRONIZACIÓN FINALIZADA en {duration:.1f} minutos.")
+    print(f"📥 Filas descargadas: {total_descargados}")
+    print(f"📊 Contratos nuevos o actualizados en BD: {total_nuevos}")
+    print(f"💀 Errores de conexión: {errores}")
+    print("="*50)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sincronización incremental de contratos SECOP II.")
+    parser.add_argument("--departamento", action="append",
+                        help="Sincronizar solo este departamento (se puede repetir).")
+    parser.add_argument("--desde", type=datetime.fromisoformat, default=FECHA_INICIAL_POR_DEFECTO,
+                        help="Fecha inicial (ISO) para departamentos sin marca de agua.")
+    parser.add_argument("--refrescar-desde", type=datetime.fromisoformat, default=None,
+                        help="Ignorar las marcas de agua y re-revisar desde esta fecha (ISO).")
+    args = parser.parse_args()
+    sincronizar(args.departamento, args.desde, args.refrescar_desde)
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import joblib
+from src.utils.config import Config
+
+# Versiones del modelo de riesgo: un artefacto joblib por versión más un índice JSON
+# con la versión activa y los metadatos de cada una
+DIRECTORIO_MODELOS = os.path.join("data", "modelos")
+RUTA_INDICE = os.path.join(DIRECTORIO_MODELOS, "indice.json")
+# Mejor configuración encontrada por la búsqueda de hiperparámetros
+RUTA_HIPERPARAMETROS = os.path.join(DIRECTORIO_MODELOS, "hiperparametros.json")
+# Archivo único de las versiones anteriores al almacén (lo importa migrar_modelo_legado)
+RUTA_MODELO_LEGADO = os.path.join("data", "modelo_entrenado.pkl")
+
+
+def _leer_indice():
+    try:
+        with open(RUTA_INDICE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_indice(indice):
+    os.makedirs(DIRECTORIO_MODELOS, exist_ok=True)
+    with open(f"{RUTA_INDICE}.tmp", "w", encoding="utf-8") as f:
+        json.dump(indice, f, indent=2)
+    os.replace(f"{RUTA_INDICE}.tmp", RUTA_INDICE)
+
+
+def _indice():
+    """Índice actual (vacío si el almacén aún no existe). Solo lee: nunca importa ni escribe."""
+    return _leer_indice() or {"activa": None, "versiones": []}
+
+
+def _buscar(indice, version):
+    for metadatos in indice["versiones"]:
+        if metadatos["version"] == version:
+            return metadatos
+    return None
+
+
+def listar_versiones():
+    """Metadatos de cada versión guardada, de la más antigua a la más reciente."""
+    return list(_indice()["versiones"])
+
+
+def version_activa():
+    """Versión que usa el motor (None si no hay ninguna)."""
+    return _indice()["activa"]
+
+
+def guardar_version(estado, metadatos):
+    """
+    Guarda el estado del motor como la versión metadatos["version"] y la activa.
+    Si la versión ya existe (p. ej. un re-entrenamiento sin cambios) solo se actualizan
+    sus metadatos: el artefacto puede estar mapeado en memoria y no se reescribe.
+    Conserva las últimas MODELOS_MAX_VERSIONES versiones.
+    """
+    indice = _indice()
+    version = metadatos["version"]
+    existente = _buscar(indice, version)
+    if existente is None:
+        archivo = f"modelo_{version}.joblib"
+        ruta = os.path.join(DIRECTORIO_MODELOS, archivo)
+        os.makedirs(DIRECTORIO_MODELOS, exist_ok=True)
+        # Sin compresión para que la carga pueda usar mmap_mode (joblib no mapea archivos comprimidos)
+        joblib.dump(estado, f"{ruta}.tmp")
+        os.replace(f"{ruta}.tmp", ruta)
+        existente = {"version": version, "archivo": archivo, "creado": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        indice["versiones"].append(existente)
+    existente.update({clave: valor for clave, valor in metadatos.items() if clave != "version"})
+    indice["activa"] = version
+
+    # Retención: descartar las más antiguas (nunca la activa)
+    sobrantes = len(indice["versiones"]) - max(Config.MODELOS_MAX_VERSIONES, 1)
+    for viejo in [m for m in indice["versiones"] if m["version"] != version][:max(sobrantes, 0)]:
+        indice["versiones"].remove(viejo)
+        _borrar_artefacto(viejo)
+    _escribir_indice(indice)
+    return version
+
+
+def cargar_version(version=None):
+    """
+    Estado guardado de `version` (por defecto la activa) o None si no existe.
+    Se lee con mmap_mode="r", pero sklearn (Tree.__setstate__) copia los nodos y valores
+    de cada árbol a memoria propia al deserializarlo: solo los arreglos sueltos del
+    estimador (p. ej. classes_) quedan mapeados. Lo que ahorra tiempo de arranque es que
+    MotorIA difiere esta carga hasta el primer uso, no el mapeo.
+    """
+    indice = _indice()
+    version = version or indice["activa"]
+    metadatos = _buscar(indice, version) if version else None
+    if metadatos is None:
+        return None
+    return joblib.load(os.path.join(DIRECTORIO_MODELOS, metadatos["archivo"]), mmap_mode="r")
+
+
+def activar_version(version):
+    """Marca `version` como activa sin re-entrenar."""
+    indice = _indice()
+    if _buscar(indice, version) is None:
+        raise ValueError(f"No existe la versión de modelo {version}")
+    indice["activa"] = version
+    _escribir_indice(indice)
+    return version
+
+
+def revertir_version():
+    """Activa la versión guardada justo antes de la activa (rollback). Retorna la versión o None."""
+    indice = _indice()
+    versiones = [m["version"] for m in indice["versiones"]]
+    if indice["activa"] not in versiones:
+        return None
+    posicion = versiones.index(indice["activa"])
+    if posicion == 0:
+        return None
+    return activar_version(versiones[posicion - 1])
+
+
+def eliminar_version(version):
+    """Borra una versión; si era la activa, el almacén queda sin versión activa."""
+    indice = _indice()
+    metadatos = _buscar(indice, version)
+    if metadatos is None:
+        return
+    indice["versiones"].remove(metadatos)
+    if indice["activa"] == version:
+        indice["activa"] = None
+    _escribir_indice(indice)
+    _borrar_artefacto(metadatos)
+
+
+def _borrar_artefacto(metadatos):
+    try:
+        os.remove(os.path.join(DIRECTORIO_MODELOS, metadatos["archivo"]))
+    except OSError:
+        pass # Windows no deja borrar un archivo mapeado en memoria; queda huérfano
+
+
+def migrar_modelo_legado():
+    """
+    Paso explícito de actualización (al iniciar la aplicación o el entrenamiento por
+    consola): si el almacén aún no existe y hay un modelo_entrenado.pkl, lo importa.
+    Retorna la versión importada o None.
+    """
+    if _leer_indice() is not None or not os.path.exists(RUTA_MODELO_LEGADO):
+        return None
+    return importar_modelo_legado()
+
+
+def importar_modelo_legado(ruta=RUTA_MODELO_LEGADO):
+    """Importa el modelo_entrenado.pkl de versiones anteriores como una versión del almacén."""
+    estado = joblib.load(ruta)
+    version = estado.get("version_modelo") or f"legado-{int(os.path.getmtime(ruta))}"
+    estado["version_modelo"] = version
+    metricas = estado.get("metrics", {})
+    print(f"📥 Importando {ruta} al almacén de modelos como versión {version}")
+    return guardar_version(estado, {
+        "version": version,
+        "filas_entrenamiento": metricas.get("total_datos"),
+        "ultimo_id_entrenado": estado.get("ultimo_id_entrenado"),
+        "modo": metricas.get("modo", "legado"),
+        "arboles": len(getattr(estado["model"], "estimators_", [])),
+        "precision": metricas.get("precision"),
+    })
+
+
+def guardar_hiperparametros(resultado):
+    """Guarda el resultado de buscar_hiperparametros (sin el historial completo)."""
+    os.makedirs(DIRECTORIO_MODELOS, exist_ok=True)
+    registro = {clave: valor for clave, valor in resultado.items() if clave != "historial"}
+    registro["creado"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with open(f"{RUTA_HIPERPARAMETROS}.tmp", "w", encoding="utf-8") as f:
+        json.dump(registro, f, indent=2)
+    os.replace(f"{RUTA_HIPERPARAMETROS}.tmp", RUTA_HIPERPARAMETROS)
+
+
+def leer_hiperparametros():
+    """Parámetros del Random Forest elegidos por la búsqueda ({} si nunca se ajustaron)."""
+    try:
+        with open(RUTA_HIPERPARAMETROS, encoding="utf-8") as f:
+            return json.load(f).get("parametros", {})
+    except (OSError, ValueError):
+        return {}
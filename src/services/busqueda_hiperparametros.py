@@ -0,0 +1,123 @@
+import os
+import time
+import random
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import StratifiedKFold
+from src.utils.config import Config
+
+# Espacio de búsqueda del Random Forest. La primera combinación de cada lista es la de
+# sklearn por defecto, así la configuración base siempre se evalúa primero como referencia.
+ESPACIO_BUSQUEDA = {
+    "max_depth": [None, 8, 12, 20],
+    "min_samples_leaf": [1, 2, 5, 10],
+    "max_features": ["sqrt", 0.5, 1.0],
+    "class_weight": [None, "balanced", "balanced_subsample"],
+}
+
+# Pliegues de validación ya separados, cargados una sola vez en cada proceso del pool
+_pliegues = None
+
+
+def _inicializar_proceso(X, y, indices_pliegues):
+    """Initializer del pool: corta los pliegues una vez por proceso (no una vez por configuración)."""
+    global _pliegues
+    _pliegues = [(X[entreno], y[entreno], X[validacion], y[validacion])
+                 for entreno, validacion in indices_pliegues]
+
+
+def _evaluar(parametros, arboles, umbral, limite):
+    """
+    Accuracy media de validación cruzada de `parametros`, pliegue por pliegue.
+    Parada temprana: desde el segundo pliegue, si la media va por debajo de `umbral` (la
+    mejor configuración conocida menos la tolerancia) o ya se pasó la hora `limite`, se
+    abandona. Retorna (parametros, puntajes por pliegue, completa).
+    """
+    puntajes = []
+    for X_tr, y_tr, X_va, y_va in _pliegues:
+        if puntajes and time.time() > limite:
+            return parametros, puntajes, False
+        modelo = RandomForestClassifier(n_estimators=arboles, random_state=42, n_jobs=1, **parametros)
+        modelo.fit(X_tr, y_tr)
+        puntajes.append(float((modelo.predict(X_va) == y_va).mean()))
+        if len(puntajes) >= 2 and np.mean(puntajes) < umbral:
+            return parametros, puntajes, False
+    return parametros, puntajes, True
+
+
+def _candidatos(semilla=42):
+    """Todas las combinaciones del espacio: primero la base, luego en orden aleatorio (random search)."""
+    nombres = list(ESPACIO_BUSQUEDA)
+    combinaciones = [dict(zip(nombres, valores)) for valores in itertools.product(*ESPACIO_BUSQUEDA.values())]
+    base, resto = combinaciones[0], combinaciones[1:]
+    random.Random(semilla).shuffle(resto)
+    return [base] + resto
+
+
+def buscar_hiperparametros(X, y, presupuesto_segundos=None, procesos=None, pliegues=None):
+    """
+    Búsqueda aleatoria con validación cruzada estratificada sobre ESPACIO_BUSQUEDA en un
+    pool de procesos, acotada por un presupuesto de tiempo de reloj.
+
+    X, y: arreglos NumPy de entrenamiento (sin el holdout de evaluación).
+    procesos: 0/None = núcleos - 1 (deja uno libre para el analista).
+    Retorna un dict con los mejores parámetros, su puntaje, el de la configuración base y
+    el historial de configuraciones evaluadas.
+    """
+    presupuesto_segundos = presupuesto_segundos or Config.BUSQUEDA_PRESUPUESTO_SEGUNDOS
+    procesos = procesos or Config.BUSQUEDA_PROCESOS or max((os.cpu_count() or 2) - 1, 1)
+    pliegues = pliegues or Config.BUSQUEDA_PLIEGUES
+
+    # Submuestra aleatoria para que cada configuración cueste segundos, no minutos
+    if len(y) > Config.BUSQUEDA_MAX_FILAS:
+        elegidas = np.random.default_rng(42).choice(len(y), Config.BUSQUEDA_MAX_FILAS, replace=False)
+        X, y = X[elegidas], y[elegidas]
+    indices_pliegues = list(StratifiedKFold(n_splits=pliegues, shuffle=True, random_state=42).split(X, y))
+
+    inicio = time.time()
+    limite = inicio + presupuesto_segundos
+    pendientes = _candidatos()
+    base = pendientes[0]
+    historial, mejor, puntaje_base = [], None, None
+    print(f"🔎 Búsqueda de hiperparámetros: {len(pendientes)} combinaciones, {procesos} procesos, "
+          f"{pliegues} pliegues, {len(y):,} filas, presupuesto {presupuesto_segundos:.0f}s")
+
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_inicializar_proceso,
+                             initargs=(X, y, indices_pliegues)) as pool:
+        en_curso = set()
+        while pendientes or en_curso:
+            # Mantener el pool lleno mientras quede presupuesto
+            while pendientes and len(en_curso) < procesos and time.time() < limite:
+                umbral = mejor["puntaje"] - Config.BUSQUEDA_TOLERANCIA if mejor else -1.0
+                en_curso.add(pool.submit(_evaluar, pendientes.pop(0), Config.BUSQUEDA_ARBOLES, umbral, limite))
+            if not en_curso:
+                break
+            listos, en_curso = wait(en_curso, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                parametros, puntajes, completa = futuro.result()
+                puntaje = float(np.mean(puntajes))
+                historial.append({"parametros": parametros, "puntaje": puntaje,
+                                  "pliegues_evaluados": len(puntajes), "completa": completa})
+                if parametros == base:
+                    puntaje_base = puntaje
+                if completa and (mejor is None or puntaje > mejor["puntaje"]):
+                    mejor = {"parametros": parametros, "puntaje": puntaje}
+                    print(f"   ⭐ {puntaje:.2%} con {parametros}")
+            if time.time() >= limite:
+                pendientes = [] # Sin presupuesto: solo se esperan las evaluaciones en curso
+
+    segundos = time.time() - inicio
+    descartadas = sum(1 for h in historial if not h["completa"])
+    print(f"✅ {len(historial)} configuraciones en {segundos:.0f}s ({descartadas} detenidas antes de tiempo)")
+    return {
+        "parametros": mejor["parametros"] if mejor else {},
+        "puntaje_cv": mejor["puntaje"] if mejor else None,
+        "puntaje_base": puntaje_base,
+        "evaluadas": len(historial),
+        "descartadas": descartadas,
+        "segundos": segundos,
+        "filas": len(y),
+        "historial": historial,
+    }
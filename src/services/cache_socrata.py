@@ -0,0 +1,103 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+
+class SinDatosEnCacheError(RuntimeError):
+    """Modo offline: la consulta pedida no está en el caché local."""
+
+
+class CacheRespuestas:
+    """
+    Caché en disco de respuestas de Socrata, direccionado por contenido.
+    - Clave: hash SHA-256 de dataset + parámetros SoQL (select, where, order, limit, offset).
+    - Cada respuesta se guarda como JSON comprimido con gzip, junto con su hora de creación.
+    - Vence a los `ttl_segundos` (salvo en modo offline, que acepta entradas vencidas).
+    - Si el directorio supera `max_bytes` se borran las entradas usadas hace más tiempo (LRU por mtime).
+    """
+    def __init__(self, directorio: str, ttl_segundos: float, max_bytes: int):
+        self.directorio = directorio
+        self.ttl_segundos = ttl_segundos
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes_totales = None # Se calcula perezosamente en el primer guardado
+
+    @staticmethod
+    def clave(dataset: str, parametros: Dict) -> str:
+        contenido = json.dumps({"dataset": dataset, **parametros}, sort_keys=True, default=str)
+        return hashlib.sha256(contenido.encode("utf-8")).hexdigest()
+
+    def _ruta(self, clave: str) -> str:
+        # Subcarpetas por prefijo para no tener miles de archivos en un solo directorio
+        return os.path.join(self.directorio, clave[:2], f"{clave}.json.gz")
+
+    def obtener(self, clave: str, ignorar_ttl: bool = False) -> Optional[List[Dict]]:
+        """Devuelve la respuesta guardada o None si no existe / está vencida."""
+        ruta = self._ruta(clave)
+        try:
+            with gzip.open(ruta, "rt", encoding="utf-8") as f:
+                entrada = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if not ignorar_ttl and time.time() - entrada["creado"] > self.ttl_segundos:
+            return None
+
+        # Marcar como usada recientemente (el mtime es el reloj del LRU)
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+        return entrada["datos"]
+
+    def guardar(self, clave: str, datos: List[Dict]):
+        ruta = self._ruta(clave)
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+
+        # Escritura atómica: varios hilos/procesos pueden pedir la misma página
+        temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(temporal, "wt", encoding="utf-8") as f:
+            json.dump({"creado": time.time(), "datos": datos}, f)
+        os.replace(temporal, ruta)
+
+        with self._lock:
+            if self._bytes_totales is None:
+                self._bytes_totales = sum(tam for _, tam, _ in self._listar())
+            else:
+                self._bytes_totales += os.path.getsize(ruta)
+            if self._bytes_totales > self.max_bytes:
+                self._podar()
+
+    def _listar(self):
+        """(ruta, tamaño, mtime) de cada entrada del caché."""
+        entradas = []
+        for raiz, _, archivos in os.walk(self.directorio):
+            for nombre in archivos:
+                if not nombre.endswith(".json.gz"):
+                    continue
+                ruta = os.path.join(raiz, nombre)
+                try:
+                    st = os.stat(ruta)
+                except OSError:
+                    continue
+                entradas.append((ruta, st.st_size, st.st_mtime))
+        return entradas
+
+    def _podar(self):
+        """Elimina las entradas menos usadas hasta quedar en el 90% del tope."""
+        entradas = sorted(self._listar(), key=lambda e: e[2])
+        total = sum(tam for _, tam, _ in entradas)
+        objetivo = self.max_bytes * 0.9
+        for ruta, tam, _ in entradas:
+            if total <= objetivo:
+                break
+            try:
+                os.remove(ruta)
+                total -= tam
+            except OSError:
+                pass
+        self._bytes_totales = total
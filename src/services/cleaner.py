@@ -1,74 +1,78 @@
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
+from src.services.normalizacion import clave_canonica
 
 class DataCleaner:
     def __init__(self):
         self.encoders = {}
 
-    def preparar_datos_entrenamiento(self, proyectos):
+    def preparar_datos_entrenamiento(self, features):
         """
-        Recibe una lista de objetos Proyecto (SQLAlchemy) y devuelve un DataFrame
-        listo para entrenar modelos de ML.
+        Recibe el DataFrame de GestorBaseDatos.obtener_features_entrenamiento()
+        (ya agregado en SQL) y devuelve X, y listos para entrenar modelos de ML.
         """
-        if not proyectos:
+        if features is None or features.empty:
             return pd.DataFrame()
 
-        # 1. Convertir a DataFrame plano
-        data = []
-        for p in proyectos:
-            # Calcular si tuvo riesgo (adiciones en dinero o tiempo)
-            total_adiciones_dinero = sum([a.valor_adicionado for a in p.adiciones])
-            total_adiciones_dias = sum([a.tiempo_adicionado_dias for a in p.adiciones])
-            
-            tiene_riesgo = 1 if (total_adiciones_dinero > 0 or total_adiciones_dias > 0) else 0
-            
-            # Calcular duración estimada en días (si hay fechas)
-            duracion_dias = 0
-            if p.fecha_inicio and p.fecha_fin:
-                try:
-                    delta = p.fecha_fin - p.fecha_inicio
-                    duracion_dias = delta.days
-                except:
-                    duracion_dias = 0
-
-            row = {
-                'presupuesto': p.presupuesto_inicial or 0,
-                'duracion_estimada': duracion_dias,
-                'tipo_contrato': p.tipo_contrato or "Desconocido",
-                'departamento': p.departamento or "Desconocido",
-                'entidad': p.nombre_entidad or "Desconocida",
-                'target_riesgo': tiene_riesgo
-            }
-            data.append(row)
-
-        df = pd.DataFrame(data)
+        # 1. Etiqueta: tuvo riesgo si hubo adiciones en dinero o tiempo
+        df = features.copy()
+        df['target_riesgo'] = ((df['total_adiciones_dinero'] > 0) | (df['total_adiciones_dias'] > 0)).astype(int)
 
         # 2. Limpieza y Codificación (Encoding)
         
-        # A. Codificar DEPARTAMENTO (Label Encoding)
-        le_depto = LabelEncoder()
-        df['depto_encoded'] = le_depto.fit_transform(df['departamento'].astype(str))
-        self.encoders['departamento'] = le_depto
+        # A/B. Codificar DEPARTAMENTO y TIPO CONTRATO con los ids de sus tablas de dimensión
+        # (estables entre entrenamientos, a diferencia de un LabelEncoder que re-numera
+        # cada vez que aparece una categoría nueva). 0 = sin dato.
+        df['depto_encoded'] = df['departamento_id']
+        self.encoders['departamento'] = self._mapa_codigos('departamento', df['departamento'], df['departamento_id'])
 
-        # B. Codificar TIPO CONTRATO (Label Encoding)
-        le_tipo = LabelEncoder()
-        df['tipo_encoded'] = le_tipo.fit_transform(df['tipo_contrato'].astype(str))
-        self.encoders['tipo_contrato'] = le_tipo
+        df['tipo_encoded'] = df['tipo_contrato_id']
+        self.encoders['tipo_contrato'] = self._mapa_codigos('tipo_contrato', df['tipo_contrato'], df['tipo_contrato_id'])
 
         # C. Codificar ENTIDAD (Frequency Encoding - Mejor para muchas categorías)
         # Reemplazamos el nombre por qué tan frecuente es esa entidad (0 a 1)
         # Esto ayuda al modelo a saber si es una entidad que contrata mucho o poco.
         freq = df['entidad'].value_counts() / len(df)
-        df['entidad_freq'] = df['entidad'].map(freq)
+        df['entidad_freq'] = df['entidad'].map(freq).astype(float)
+        # Tabla de frecuencias para codificar entidades en predicciones individuales
+        self.encoders['entidad'] = {clave_canonica('entidad', n): float(f) for n, f in freq.items() if f > 0}
 
         # Seleccionar columnas finales para el modelo
-        features = ['presupuesto', 'duracion_estimada', 'depto_encoded', 'tipo_encoded', 'entidad_freq']
-        X = df[features].fillna(0)
+        columnas = ['presupuesto', 'duracion_estimada', 'depto_encoded', 'tipo_encoded', 'entidad_freq']
+        X = df[columnas].fillna(0)
         y = df['target_riesgo']
 
         return X, y, df # Retornamos también el DF completo para visualización si se requiere
 
+    @staticmethod
+    def _mapa_codigos(dimension, nombres, codigos):
+        """{clave canónica del nombre: id de dimensión} para codificar entradas nuevas."""
+        pares = pd.DataFrame({'nombre': nombres.astype(str), 'codigo': codigos}).drop_duplicates('nombre')
+        return {clave_canonica(dimension, n): int(c) for n, c in zip(pares['nombre'], pares['codigo']) if c}
+
+    def codificar(self, dimension, valor):
+        """
+        Código de `valor` con el encoder entrenado de `dimension`: dict de ids de dimensión o,
+        en modelos guardados antes de las tablas de dimensión, un LabelEncoder. 0 si es desconocido.
+        """
+        encoder = self.encoders.get(dimension)
+        if encoder is None:
+            return 0
+        if isinstance(encoder, LabelEncoder):
+            try:
+                return int(encoder.transform([valor])[0])
+            except ValueError:
+                return 0
+        return encoder.get(clave_canonica(dimension, valor), 0)
+
+    def frecuencia_entidad(self, entidad):
+        """Frecuencia de `entidad` en los datos de entrenamiento (0.0 si no aparece, None sin tabla)."""
+        frecuencias = self.encoders.get('entidad')
+        if frecuencias is None:
+            return None
+        return frecuencias.get(clave_canonica('entidad', entidad), 0.0)
+
     def preparar_datos_prediccion(self, datos_entrada):
         """
         Prepara un solo registro (o lista) para predecir, usando los encoders ya entrenados.
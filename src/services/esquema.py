@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+
+@dataclass(frozen=True)
+class ColumnaFuente:
+    nombre: str  # columna en el dataset de Socrata (jbjy-vk9h)
+    tipo: str  # "texto" | "decimal" | "entero" | "fecha" | "booleano"
+    destino: str  # "tabla.campo" del modelo que alimenta
+
+
+# Columna que identifica al contrato (Proyecto.id)
+COLUMNA_ID = "referencia_del_contrato"
+
+# Única declaración de las columnas que se descargan y de su destino en la BD.
+# Si varias columnas apuntan al mismo campo, sus valores se suman.
+ESQUEMA_CONTRATOS: Tuple[ColumnaFuente, ...] = (
+    # Proyecto
+    ColumnaFuente(COLUMNA_ID, "texto", "proyectos.id"),
+    ColumnaFuente("nombre_entidad", "texto", "proyectos.nombre_entidad"),
+    ColumnaFuente("objeto_del_contrato", "texto", "proyectos.nombre_proyecto"),
+    ColumnaFuente("valor_del_contrato", "decimal", "proyectos.presupuesto_inicial"),
+    ColumnaFuente("fecha_de_inicio_del_contrato", "fecha", "proyectos.fecha_inicio"),
+    ColumnaFuente("fecha_de_fin_del_contrato", "fecha", "proyectos.fecha_fin"),
+    ColumnaFuente("departamento", "texto", "proyectos.departamento"),
+    ColumnaFuente("ciudad", "texto", "proyectos.municipio"),
+    ColumnaFuente("tipo_de_contrato", "texto", "proyectos.tipo_contrato"),
+    ColumnaFuente("el_contrato_puede_ser_prorrogado", "booleano", "proyectos.es_prorrogable"),
+    ColumnaFuente("fecha_de_notificaci_n_de_prorrogaci_n", "fecha", "proyectos.fecha_ultima_prorroga"),
+    # Adición (modificaciones reportadas)
+    ColumnaFuente("valor_total_de_adiciones", "decimal", "adiciones.valor_adicionado"),
+    ColumnaFuente("dias_adicionados", "entero", "adiciones.tiempo_adicionado_dias"),
+    ColumnaFuente("fecha_de_firma", "fecha", "adiciones.fecha"),
+    # Datos financieros (origen de recursos)
+    ColumnaFuente("presupuesto_general_de_la_nacion_pgn", "decimal", "datos_financieros.pgn"),
+    ColumnaFuente("sistema_general_de_participaciones", "decimal", "datos_financieros.sgp"),
+    ColumnaFuente("sistema_general_de_regal_as", "decimal", "datos_financieros.regalias"),
+    ColumnaFuente("recursos_de_credito", "decimal", "datos_financieros.recursos_credito"),
+    ColumnaFuente("recursos_propios", "decimal", "datos_financieros.recursos_propios"),
+    ColumnaFuente(
+        "recursos_propios_alcald_as_gobernaciones_y_resguardos_ind_genas_",
+        "decimal",
+        "datos_financieros.recursos_propios",
+    ),
+)
+
+
+def columnas_select() -> str:
+    """Lista de columnas para el $select de SoQL."""
+    return ", ".join(c.nombre for c in ESQUEMA_CONTRATOS)
+
+
+def columnas_por_tipo(*tipos: str) -> List[str]:
+    """Nombres de columnas fuente de los tipos dados."""
+    return [c.nombre for c in ESQUEMA_CONTRATOS if c.tipo in tipos]
+
+
+def campos_destino(tabla: str) -> Dict[str, List[ColumnaFuente]]:
+    """Campos de `tabla` -> columnas fuente que los alimentan (en orden de declaración)."""
+    campos: Dict[str, List[ColumnaFuente]] = {}
+    for c in ESQUEMA_CONTRATOS:
+        tabla_destino, campo = c.destino.split(".", 1)
+        if tabla_destino == tabla:
+            campos.setdefault(campo, []).append(c)
+    return campos
@@ -1,53 +1,137 @@
 import pandas as pd
 import numpy as np
-import os
-import joblib
+import time
+import functools
+import threading
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
-from src.services.cleaner import DataCleaner
+from sklearn.preprocessing import LabelEncoder
 from src.database.db_manager import GestorBaseDatos
+from src.database.escritor import obtener_escritor
+from src.services import almacen_modelos
+from src.services.busqueda_hiperparametros import ESPACIO_BUSQUEDA, buscar_hiperparametros
+from src.services.cleaner import DataCleaner
+from src.services.snapshot import cargar_features
+from src.utils.config import Config
+
+# Holdout fijo: 1 de cada N proyectos (por hash de su id de contrato) nunca se usa para ajustar
+# árboles, así las evaluaciones de entrenamientos completos e incrementales son comparables
+# y los árboles agregados con warm_start no ven filas de prueba. No se usa el rowid: un
+# upsert re-inserta el contrato con otro rowid y lo cambiaría de lado.
+DIVISOR_PRUEBA = 5
+# Se guarda con el modelo: un bosque con otra partición no admite árboles incrementales
+ESQUEMA_PRUEBA = f"hash_id/{DIVISOR_PRUEBA}"
+
+
+def _es_prueba(df_completo):
+    """Máscara NumPy del holdout, estable entre entrenamientos para cada proyecto."""
+    ids = df_completo['proyecto_id'].to_numpy(dtype=object)
+    return (pd.util.hash_array(ids) % DIVISOR_PRUEBA) == 0
+
+
+def _nuevo_modelo():
+    # Hiperparámetros de la última búsqueda (ajustar_hiperparametros), o los de sklearn
+    return RandomForestClassifier(n_estimators=Config.ENTRENAMIENTO_ARBOLES, random_state=42,
+                                  n_jobs=Config.ENTRENAMIENTO_N_JOBS, **almacen_modelos.leer_hiperparametros())
 
-# Ruta donde se guardará el modelo
-RUTA_MODELO = os.path.join("data", "modelo_entrenado.pkl")
 
 class MotorIA:
     def __init__(self):
         self.cleaner = DataCleaner()
-        self.model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.entrenado = False
+        self.model = _nuevo_modelo()
+        self._entrenado = False
         self.feature_names = []
         self.metrics = {} # Guardar métricas de la última vez
+        # Mayor rowid de proyectos visto en el último entrenamiento (marca para el modo incremental)
+        self.ultimo_id_entrenado = None
+        # [identidad de la BD, generación de datos] del último ajuste: un rowid solo se
+        # compara con otro de la misma BD (el seed borra y recrea el archivo)
+        self.marca_datos = None
+        # fecha_de_firma más reciente que había en la BD en ese ajuste (metadato de la versión)
+        self.marca_agua_ingesta = None
+        self.esquema_prueba = None
+        # Identifica el modelo con que se calculó cada puntaje_riesgo guardado en la BD
+        self.version_modelo = None
+        # Camino rápido de predecir_riesgo (ver _preparar_prediccion)
+        self._probabilidad_cacheada = None
+        self._lock_prediccion = threading.Lock()
         
-        # Intentar cargar modelo existente al iniciar
-        self.cargar_modelo()
+        # El modelo guardado se carga en el primer uso (no al crear la ventana)
+        self._cargado = False
+        self._lock_carga = threading.Lock()
+
+    @property
+    def entrenado(self):
+        """Hay un modelo listo. Antes de cargarlo basta con consultar el índice del almacén."""
+        if not self._cargado:
+            return almacen_modelos.version_activa() is not None
+        return self._entrenado
 
-    def entrenar(self):
+    @entrenado.setter
+    def entrenado(self, valor):
+        self._entrenado = valor
+
+    def _asegurar_cargado(self):
+        with self._lock_carga:
+            if not self._cargado:
+                self.cargar_modelo()
+
+    def entrenar(self, modo="auto"):
         """
         Carga datos de la BD, los limpia y entrena el modelo.
-        Retorna un diccionario con métricas de rendimiento.
+        modo: "completo" (bosque nuevo desde cero), "incremental" (warm_start: agrega
+        árboles ajustados solo con los proyectos ingresados desde el último entrenamiento)
+        o "auto" (incremental salvo que la política pida reconstruir; ver _decidir_modo).
+        Retorna un diccionario con métricas de rendimiento, el modo aplicado y los tiempos.
         """
+        self._asegurar_cargado() # El modo incremental parte del modelo activo
         print("🧠 Entrenando Modelo de IA...")
+        inicio = time.perf_counter()
         gestor = GestorBaseDatos()
-        proyectos = gestor.obtener_todos_proyectos()
+        # Antes de leer: si alguien escribe mientras tanto, el próximo entrenamiento lo verá
+        marca_datos = gestor.obtener_marca_datos()
+        marca_agua_ingesta = gestor.obtener_marca_agua_ingesta()
+        # Snapshot columnar si está al día; si no, consulta agregada a SQLite
+        features = cargar_features(gestor)
         
-        if not proyectos or len(proyectos) < 10:
+        if len(features) < 10:
             return {"error": "No hay suficientes datos para entrenar (Mínimo 10)."}
 
         # Limpieza y Preparación
-        X, y, df_completo = self.cleaner.preparar_datos_entrenamiento(proyectos)
-        self.feature_names = X.columns.tolist()
+        X, y, df_completo = self.cleaner.preparar_datos_entrenamiento(features)
+        ids = df_completo['orden_ingreso'].to_numpy()
+        prueba = _es_prueba(df_completo)
+        X_train, y_train = X[~prueba], y[~prueba]
+        X_test, y_test = X[prueba], y[prueba]
+        segundos_carga = time.perf_counter() - inicio
 
-        # Split Train/Test (80% entrenamiento, 20% validación)
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-        # Verificar si el modelo existe (por si fue borrado)
-        if self.model is None:
-            self.model = RandomForestClassifier(n_estimators=100, random_state=42)
+        modo_aplicado, motivo = self._decidir_modo(modo, X.columns.tolist(), ids, ids[~prueba], y_train, marca_datos)
+        print(f"   Modo {modo_aplicado}: {motivo}")
+        self.feature_names = X.columns.tolist()
 
         # Entrenamiento
-        self.model.fit(X_train, y_train)
+        inicio_ajuste = time.perf_counter()
+        if modo_aplicado == "completo":
+            self.model = _nuevo_modelo()
+            self.model.fit(X_train, y_train)
+            filas_ajuste = len(X_train)
+        elif modo_aplicado == "incremental":
+            nuevos = ids[~prueba] > self.ultimo_id_entrenado
+            self.model.set_params(warm_start=True, n_jobs=Config.ENTRENAMIENTO_N_JOBS,
+                                  n_estimators=len(self.model.estimators_) + Config.ENTRENAMIENTO_ARBOLES_INCREMENTO)
+            self.model.fit(X_train[nuevos], y_train[nuevos])
+            self.model.set_params(warm_start=False)
+            filas_ajuste = int(nuevos.sum())
+        else:
+            filas_ajuste = 0 # sin_cambios: se re-evalúa el modelo actual
+        segundos_ajuste = time.perf_counter() - inicio_ajuste
         self.entrenado = True
+        if modo_aplicado != "sin_cambios":
+            self.ultimo_id_entrenado = int(ids.max())
+            self.marca_datos = marca_datos
+            self.marca_agua_ingesta = marca_agua_ingesta
+            self.esquema_prueba = ESQUEMA_PRUEBA
+            self.version_modelo = self._nueva_version()
 
         # Evaluación
         y_pred = self.model.predict(X_test)
@@ -57,13 +141,32 @@ class MotorIA:
         importancias = dict(zip(self.feature_names, self.model.feature_importances_))
         importancias = dict(sorted(importancias.items(), key=lambda item: item[1], reverse=True))
 
-        print(f"✅ Modelo Entrenado. Precisión: {accuracy:.2%}")
+        self._preparar_prediccion()
+
+        segundos_total = time.perf_counter() - inicio
+        print(f"✅ Modelo Entrenado ({modo_aplicado}, {len(self.model.estimators_)} árboles, "
+              f"{segundos_ajuste:.1f}s de ajuste). Precisión: {accuracy:.2%}")
+
+        # Último tiempo de ajuste de cada modo, para comparar completo vs incremental
+        tiempos_por_modo = dict(self.metrics.get("tiempos_por_modo", {}))
+        if modo_aplicado != "sin_cambios":
+            tiempos_por_modo[modo_aplicado] = segundos_ajuste
         
         resultados = {
             "precision": accuracy,
-            "total_datos": len(proyectos),
+            "total_datos": len(features),
             "importancia_variables": importancias,
-            "reporte": classification_report(y_test, y_pred, output_dict=True)
+            "reporte": classification_report(y_test, y_pred, output_dict=True),
+            "modo": modo_aplicado,
+            "motivo": motivo,
+            "arboles": len(self.model.estimators_),
+            "version_modelo": self.version_modelo,
+            "filas_ajuste": filas_ajuste,
+            "n_jobs": Config.ENTRENAMIENTO_N_JOBS,
+            "segundos_carga": segundos_carga,
+            "segundos_entrenamiento": segundos_ajuste,
+            "segundos_total": segundos_total,
+            "tiempos_por_modo": tiempos_por_modo,
         }
         
         self.metrics = resultados
@@ -71,72 +174,266 @@ class MotorIA:
         
         return resultados
 
+    def ajustar_hiperparametros(self, presupuesto_segundos=None, procesos=None):
+        """
+        Busca con validación cruzada (en un pool de procesos y con presupuesto de tiempo)
+        la mejor configuración del bosque y la guarda junto a los modelos; el próximo
+        entrenamiento la usa (y por eso reconstruye el bosque desde cero).
+        Solo usa las filas de entrenamiento: el holdout fijo queda para evaluar.
+        """
+        features = cargar_features()
+        if len(features) < 10:
+            return {"error": "No hay suficientes datos para ajustar (Mínimo 10)."}
+        X, y, df_completo = self.cleaner.preparar_datos_entrenamiento(features)
+        entrenamiento = ~_es_prueba(df_completo)
+        resultado = buscar_hiperparametros(X[entrenamiento].to_numpy(dtype=np.float32),
+                                           y[entrenamiento].to_numpy(),
+                                           presupuesto_segundos=presupuesto_segundos, procesos=procesos)
+        if resultado["puntaje_cv"] is not None:
+            almacen_modelos.guardar_hiperparametros(resultado)
+        return resultado
+
+    def _decidir_modo(self, modo, feature_names, ids, ids_train, y_train, marca_datos):
+        """
+        Política de reconstrucción. Retorna (modo_aplicado, motivo):
+        - "completo" si se pidió, si no hay un modelo previo con marca de entrenamiento
+          y con el holdout actual, si el modelo se entrenó con otra BD (otra identidad, o
+          un rowid máximo menor que la marca: los rowid ya no son comparables),
+          si cambiaron las variables o los hiperparámetros, si los datos nuevos traen una sola clase, si el
+          bosque superaría ENTRENAMIENTO_MAX_ARBOLES o (en "auto") si los datos nuevos son
+          más de ENTRENAMIENTO_MAX_FRACCION_NUEVOS del total (la distribución ya cambió
+          demasiado para solo agregar árboles).
+        - "sin_cambios" si no hay filas nuevas (o, en "auto", menos de ENTRENAMIENTO_MIN_FILAS_NUEVAS).
+        - "incremental" en los demás casos.
+        """
+        if modo == "completo":
+            return "completo", "reconstrucción solicitada"
+        if not self.entrenado or self.ultimo_id_entrenado is None or not hasattr(self.model, "estimators_"):
+            return "completo", "no hay un modelo previo con marca de entrenamiento"
+        if self.marca_datos is None or self.marca_datos[0] != marca_datos[0]:
+            return "completo", "el modelo se entrenó con otra base de datos"
+        if int(ids.max()) < self.ultimo_id_entrenado:
+            return "completo", "la base de datos tiene menos proyectos que en el último entrenamiento"
+        if self.esquema_prueba != ESQUEMA_PRUEBA:
+            return "completo", "el modelo se evaluó con otra partición de prueba"
+        if feature_names != self.feature_names:
+            return "completo", "cambiaron las variables del modelo"
+        parametros = self.model.get_params()
+        if any(parametros.get(nombre) != valor for nombre, valor in almacen_modelos.leer_hiperparametros().items()):
+            return "completo", "cambiaron los hiperparámetros"
+
+        nuevos = ids_train > self.ultimo_id_entrenado
+        filas_nuevas = int(nuevos.sum())
+        if filas_nuevas == 0 or (modo == "auto" and filas_nuevas < Config.ENTRENAMIENTO_MIN_FILAS_NUEVAS):
+            return "sin_cambios", f"{filas_nuevas} proyectos nuevos desde el último entrenamiento"
+        if y_train[nuevos].nunique() < 2:
+            return "completo", "los proyectos nuevos tienen una sola clase"
+        if len(self.model.estimators_) + Config.ENTRENAMIENTO_ARBOLES_INCREMENTO > Config.ENTRENAMIENTO_MAX_ARBOLES:
+            return "completo", f"el bosque superaría {Config.ENTRENAMIENTO_MAX_ARBOLES} árboles"
+        fraccion = filas_nuevas / len(ids_train)
+        if modo == "auto" and fraccion > Config.ENTRENAMIENTO_MAX_FRACCION_NUEVOS:
+            return "completo", f"los proyectos nuevos son el {fraccion:.0%} del total"
+        return "incremental", f"{filas_nuevas} proyectos nuevos ({fraccion:.0%} del total)"
+
+    def puntuar_portafolio(self, gestor=None, tamano_lote=None):
+        """
+        Calcula el puntaje de riesgo (probabilidad de adiciones) de todos los proyectos
+        guardados que aún no tienen puntaje de la versión actual del modelo: nuevos,
+        re-ingeridos por un upsert o puntuados por un modelo anterior. Recorre la BD por
+        lotes, predice cada lote con una sola llamada vectorizada y lo envía al escritor
+        único de la BD (una transacción por lote), esperando a que quede guardado.
+        Retorna {"puntuados", "version_modelo", "segundos"} o {"error"}.
+        """
+        self._asegurar_cargado()
+        if not self.entrenado:
+            return {"error": "No hay un modelo entrenado."}
+        if any(isinstance(encoder, LabelEncoder) for encoder in self.cleaner.encoders.values()):
+            return {"error": "El modelo guardado usa la codificación anterior a las tablas de dimensión. Re-entrénelo."}
+
+        print(f"🎯 Puntuando portafolio con el modelo {self.version_modelo}...")
+        inicio = time.perf_counter()
+        gestor = gestor or GestorBaseDatos()
+        escritor = obtener_escritor(gestor.url)
+        tamano_lote = tamano_lote or Config.PUNTAJE_TAMANO_LOTE
+        # Misma codificación de entidad que en el entrenamiento: frecuencia sobre toda la BD
+        frecuencias = gestor.obtener_frecuencia_entidades()
+
+        cursor, puntuados = 0, 0
+        while True:
+            lote = gestor.obtener_lote_pendiente_puntaje(self.version_modelo, cursor, tamano_lote)
+            if lote.empty:
+                break
+            lote['entidad_freq'] = lote['entidad'].map(frecuencias).astype(float).fillna(0.0)
+            if self._indice_riesgo is None:
+                probabilidades = np.zeros(len(lote)) # El modelo solo vio proyectos sin riesgo
+            else:
+                probabilidades = self.model.predict_proba(lote[self.feature_names])[:, self._indice_riesgo]
+            futuro = escritor.enviar_puntajes(lote['proyecto_id'].tolist(), probabilidades, self.version_modelo)
+            puntuados += futuro.result()
+            cursor = int(lote['orden_ingreso'].iloc[-1])
+            print(f"   {puntuados:,} proyectos puntuados...")
+
+        segundos = time.perf_counter() - inicio
+        print(f"✅ {puntuados:,} proyectos puntuados en {segundos:.1f}s")
+        return {"puntuados": puntuados, "version_modelo": self.version_modelo, "segundos": segundos}
+
+    def _nueva_version(self):
+        """Identificador único de un modelo recién ajustado: fecha-hora y número de árboles."""
+        base = f"{time.strftime('%Y%m%d-%H%M%S')}-{len(self.model.estimators_)}"
+        existentes = {m["version"] for m in almacen_modelos.listar_versiones()}
+        version, n = base, 1
+        while version in existentes:
+            n += 1
+            version = f"{base}.{n}"
+        return version
+
     def guardar_modelo(self):
-        """Guarda el estado actual del motor en disco."""
+        """Guarda el estado actual del motor como una versión del almacén (y la activa)."""
         try:
             estado = {
                 'model': self.model,
                 'encoders': self.cleaner.encoders,
                 'feature_names': self.feature_names,
                 'entrenado': self.entrenado,
-                'metrics': self.metrics
+                'metrics': self.metrics,
+                'ultimo_id_entrenado': self.ultimo_id_entrenado,
+                'marca_datos': self.marca_datos,
+                'marca_agua_ingesta': self.marca_agua_ingesta,
+                'esquema_prueba': self.esquema_prueba,
+                'version_modelo': self.version_modelo
             }
-            joblib.dump(estado, RUTA_MODELO)
-            print(f"💾 Modelo guardado en {RUTA_MODELO}")
+            almacen_modelos.guardar_version(estado, {
+                "version": self.version_modelo,
+                "filas_entrenamiento": self.metrics.get("total_datos"),
+                "ultimo_id_entrenado": self.ultimo_id_entrenado,
+                "marca_datos": self.marca_datos,
+                "marca_agua_ingesta": self.marca_agua_ingesta.isoformat() if self.marca_agua_ingesta else None,
+                "modo": self.metrics.get("modo"),
+                "arboles": len(self.model.estimators_),
+                "precision": self.metrics.get("precision"),
+                "segundos_entrenamiento": self.metrics.get("segundos_entrenamiento"),
+                "hiperparametros": {nombre: self.model.get_params()[nombre] for nombre in ESPACIO_BUSQUEDA},
+            })
+            print(f"💾 Modelo guardado como versión {self.version_modelo}")
         except Exception as e:
             print(f"Error guardando modelo: {e}")
 
-    def cargar_modelo(self):
-        """Intenta cargar un modelo previo del disco."""
-        if os.path.exists(RUTA_MODELO):
-            try:
-                estado = joblib.load(RUTA_MODELO)
-                self.model = estado['model']
-                self.cleaner.encoders = estado['encoders']
-                self.feature_names = estado['feature_names']
-                self.entrenado = estado['entrenado']
-                self.metrics = estado.get('metrics', {})
-                print(f"📂 Modelo cargado exitosamente. Entrenado: {self.entrenado}")
-            except Exception as e:
-                print(f"Error cargando modelo: {e}")
-
-    def predecir_riesgo(self, presupuesto, duracion_dias, departamento, tipo_contrato, entidad_freq=0.01):
+    def cargar_modelo(self, version=None):
+        """Carga del almacén la versión dada (por defecto la activa); ver almacen_modelos.cargar_version."""
+        self._cargado = True
+        try:
+            estado = almacen_modelos.cargar_version(version)
+        except Exception as e:
+            print(f"Error cargando modelo: {e}")
+            return
+        if estado is None:
+            return
+        self.model = estado['model']
+        self.cleaner.encoders = estado['encoders']
+        self.feature_names = estado['feature_names']
+        self.entrenado = estado['entrenado']
+        self.metrics = estado.get('metrics', {})
+        # Modelos guardados antes del modo incremental: el próximo entrenamiento es completo
+        self.ultimo_id_entrenado = estado.get('ultimo_id_entrenado')
+        self.marca_datos = estado.get('marca_datos')
+        self.marca_agua_ingesta = estado.get('marca_agua_ingesta')
+        self.esquema_prueba = estado.get('esquema_prueba')
+        self.version_modelo = estado.get('version_modelo')
+        if self.entrenado:
+            self._preparar_prediccion()
+        print(f"📂 Modelo {self.version_modelo} cargado. Entrenado: {self.entrenado}")
+
+    def activar_version(self, version):
+        """Vuelve a una versión guardada sin re-entrenar (los puntajes se recalculan al puntuar)."""
+        with self._lock_carga:
+            almacen_modelos.activar_version(version)
+            self._reiniciar()
+            self.cargar_modelo(version)
+
+    def revertir_version(self):
+        """Rollback a la versión anterior a la activa. Retorna la versión activada o None."""
+        with self._lock_carga:
+            version = almacen_modelos.revertir_version()
+            if version is not None:
+                self._reiniciar()
+                self.cargar_modelo(version)
+            return version
+
+    def eliminar_modelo(self):
+        """Borra la versión activa del almacén y deja el motor sin modelo."""
+        with self._lock_carga:
+            version = almacen_modelos.version_activa()
+            if version is not None:
+                almacen_modelos.eliminar_version(version)
+            self._reiniciar()
+            self._cargado = True
+
+    def _reiniciar(self):
+        self.model = _nuevo_modelo()
+        self.entrenado = False
+        self.feature_names = []
+        self.metrics = {}
+        self.ultimo_id_entrenado = None
+        self.marca_datos = None
+        self.marca_agua_ingesta = None
+        self.esquema_prueba = None
+        self.version_modelo = None
+        self._probabilidad_cacheada = None
+
+    def _preparar_prediccion(self):
+        """
+        Deja listo el camino rápido de predecir_riesgo para el modelo actual: una fila
+        preasignada, la frecuencia de una entidad típica y un caché LRU nuevo (los
+        resultados del modelo anterior ya no sirven).
+        """
+        clases = list(self.model.classes_)
+        self._indice_riesgo = clases.index(1) if 1 in clases else None
+        self._fila = pd.DataFrame(np.zeros((1, len(self.feature_names))), columns=self.feature_names)
+        frecuencias = self.cleaner.encoders.get('entidad')
+        self._entidad_freq_tipica = float(np.median(list(frecuencias.values()))) if frecuencias else 0.01
+        self._probabilidad_cacheada = functools.lru_cache(maxsize=Config.PREDICCION_CACHE_MAX)(self._probabilidad)
+
+    def _probabilidad(self, valores):
+        """Probabilidad de riesgo de una fila (tupla en el orden de feature_names)."""
+        if self._indice_riesgo is None:
+            return 0.0 # El modelo solo vio proyectos sin riesgo
+        with self._lock_prediccion:
+            self._fila.iloc[0] = valores
+            return float(self.model.predict_proba(self._fila)[0, self._indice_riesgo])
+
+    def predecir_riesgo(self, presupuesto, duracion_dias, departamento, tipo_contrato, entidad_freq=None, entidad=None):
         """
         Predice el riesgo de un NUEVO proyecto hipotético.
+        La frecuencia de la entidad sale de `entidad_freq`, de la tabla de frecuencias del
+        entrenamiento si se da el nombre de la `entidad`, o de una entidad típica.
+        Las entradas recientes se responden desde un caché LRU (PREDICCION_CACHE_MAX).
         """
-        if not self.entrenado:
+        self._asegurar_cargado()
+        if not self.entrenado or self._probabilidad_cacheada is None:
             return None
 
         try:
-            # Manejo seguro de encoders
-            le_depto = self.cleaner.encoders.get('departamento')
-            depto_code = 0
-            if le_depto:
-                try: depto_code = le_depto.transform([departamento])[0]
-                except: depto_code = 0 
-
-            le_tipo = self.cleaner.encoders.get('tipo_contrato')
-            tipo_code = 0
-            if le_tipo:
-                try: tipo_code = le_tipo.transform([tipo_contrato])[0]
-                except: tipo_code = 0
-
-            input_data = pd.DataFrame([{
-                'presupuesto': presupuesto,
-                'duracion_estimada': duracion_dias,
-                'depto_encoded': depto_code,
-                'tipo_encoded': tipo_code,
-                'entidad_freq': entidad_freq
-            }])
-            
-            # Asegurar orden de columnas
-            input_data = input_data[self.feature_names]
+            # Búsqueda en los dicts del entrenamiento (valores desconocidos -> 0)
+            depto_code = self.cleaner.codificar('departamento', departamento)
+            tipo_code = self.cleaner.codificar('tipo_contrato', tipo_contrato)
+            if entidad_freq is None and entidad is not None:
+                entidad_freq = self.cleaner.frecuencia_entidad(entidad)
+            if entidad_freq is None:
+                entidad_freq = self._entidad_freq_tipica
 
-            probabilidad = self.model.predict_proba(input_data)[0][1]
-            clase = self.model.predict(input_data)[0]
+            valores = {
+                'presupuesto': float(presupuesto),
+                'duracion_estimada': float(duracion_dias),
+                'depto_encoded': float(depto_code),
+                'tipo_encoded': float(tipo_code),
+                'entidad_freq': float(entidad_freq)
+            }
+            # Asegurar orden de columnas
+            probabilidad = self._probabilidad_cacheada(tuple(valores[nombre] for nombre in self.feature_names))
 
             return {
-                "riesgo_alto": bool(clase == 1),
+                # Misma decisión que model.predict (clase con mayor probabilidad)
+                "riesgo_alto": bool(probabilidad > 0.5),
                 "probabilidad": float(probabilidad)
             }
 
@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from src.database.db_manager import GestorBaseDatos
+from src.services.snapshot import cargar_features
 
 class MotorMonteCarlo:
     def __init__(self):
@@ -14,42 +14,27 @@ class MotorMonteCarlo:
         Usamos el tiempo como proxy del riesgo financiero.
         """
         print("\n--- CALIBRANDO MOTOR MONTE CARLO (vía Tiempo) ---")
-        gestor = GestorBaseDatos()
-        proyectos = gestor.obtener_todos_proyectos()
+        # Snapshot columnar si está al día; si no, consulta agregada a SQLite
+        features = cargar_features()
         
-        if not proyectos:
+        if features.empty:
             return False
 
-        factores_tiempo = []
-        
-        for p in proyectos:
-            # Calcular duración original estimada
-            duracion_orig = 0
-            if p.fecha_inicio and p.fecha_fin:
-                try:
-                    delta = (p.fecha_fin - p.fecha_inicio).days
-                    if delta > 0:
-                        duracion_orig = delta
-                except:
-                    pass
-            
-            # Solo analizamos contratos donde tengamos datos de tiempo válidos (> 30 días)
-            if duracion_orig > 30: 
-                # Si hubo adiciones de tiempo
-                dias_extra = sum([a.tiempo_adicionado_dias for a in p.adiciones])
-                
-                # Factor = (Tiempo Real) / (Tiempo Planeado)
-                # INCLUIMOS LOS QUE NO TIENEN ADICIONES (dias_extra = 0) -> Factor 1.0
-                tiempo_total = duracion_orig + dias_extra
-                factor = tiempo_total / duracion_orig
-                
-                # Filtros de sanidad (evitar errores extremos)
-                if 0.5 <= factor <= 10.0:
-                    factores_tiempo.append(factor)
+        # Duración original estimada (días); solo contratos con datos de tiempo válidos (> 30 días)
+        duracion_orig = features['duracion_estimada'].to_numpy(dtype=float)
+        dias_extra = features['total_adiciones_dias'].to_numpy(dtype=float)
+        validos = duracion_orig > 30
+
+        # Factor = (Tiempo Real) / (Tiempo Planeado)
+        # INCLUIMOS LOS QUE NO TIENEN ADICIONES (dias_extra = 0) -> Factor 1.0
+        factores = (duracion_orig[validos] + dias_extra[validos]) / duracion_orig[validos]
+
+        # Filtros de sanidad (evitar errores extremos)
+        factores_tiempo = factores[(factores >= 0.5) & (factores <= 10.0)]
 
         print(f"⏱️ Muestra de Tiempos Total (Sanos + Retrasados): {len(factores_tiempo)} contratos")
         
-        if factores_tiempo:
+        if len(factores_tiempo) > 0:
             # Ajuste Log-Normal sobre los FACTORES DE TIEMPO
             log_data = np.log(factores_tiempo)
             mu_t = np.mean(log_data)
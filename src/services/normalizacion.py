@@ -0,0 +1,81 @@
+import re
+import unicodedata
+import pandas as pd
+
+# Lista completa de departamentos de Colombia (normalizada para SECOP)
+DEPARTAMENTOS_COLOMBIA = [
+    "Amazonas", "Antioquia", "Arauca", "Atlántico", "Bolívar",
+    "Boyacá", "Caldas", "Caquetá", "Casanare", "Cauca",
+    "Cesar", "Chocó", "Córdoba", "Cundinamarca", "Bogotá D.C.",
+    "Guainía", "Guaviare", "Huila", "La Guajira", "Magdalena",
+    "Meta", "Nariño", "Norte de Santander", "Putumayo", "Quindío",
+    "Risaralda", "San Andrés, Providencia y Santa Catalina", "Santander",
+    "Sucre", "Tolima", "Valle del Cauca", "Vaupés", "Vichada"
+]
+
+# Variantes con que SECOP reporta algunos departamentos -> nombre canónico
+ALIAS_DEPARTAMENTOS = {
+    "Bogotá D.C.": ["Bogotá", "Bogotá DC", "Bogotá D.C", "Distrito Capital de Bogotá",
+                    "Bogotá Distrito Capital", "Santa Fe de Bogotá", "Santafé de Bogotá"],
+    "San Andrés, Providencia y Santa Catalina": ["San Andrés", "San Andrés y Providencia",
+                                                 "Archipiélago de San Andrés, Providencia y Santa Catalina"],
+    "La Guajira": ["Guajira"],
+    "Norte de Santander": ["Norte Santander"],
+    "Valle del Cauca": ["Valle"],
+}
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def clave_normalizada(texto):
+    """
+    Clave de comparación de un texto libre: sin tildes, minúsculas y solo letras/dígitos
+    separados por un espacio ("  BOGOTÁ, D.C. " -> "bogota d c"). None si queda vacío.
+    """
+    if texto is None or (isinstance(texto, float) and pd.isna(texto)):
+        return None
+    sin_tildes = unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode("ascii")
+    clave = _NO_ALFANUMERICO.sub(" ", sin_tildes.lower()).strip()
+    return clave or None
+
+
+def _limpiar_espacios(texto):
+    return _ESPACIOS.sub(" ", str(texto)).strip()
+
+
+# clave normalizada de cada nombre o alias -> nombre canónico del departamento
+_CANONICO_DEPARTAMENTO = {clave_normalizada(d): d for d in DEPARTAMENTOS_COLOMBIA}
+for _canonico, _alias in ALIAS_DEPARTAMENTOS.items():
+    for _variante in _alias:
+        _CANONICO_DEPARTAMENTO[clave_normalizada(_variante)] = _canonico
+
+
+def _canonizar_valor(dimension, texto):
+    """(clave, nombre) canónicos de un valor; (None, None) si está vacío."""
+    clave = clave_normalizada(texto)
+    if clave is None:
+        return None, None
+    if dimension == "departamento":
+        canonico = _CANONICO_DEPARTAMENTO.get(clave)
+        if canonico is not None:
+            return clave_normalizada(canonico), canonico
+    return clave, _limpiar_espacios(texto)
+
+
+def clave_canonica(dimension, texto):
+    """Clave con que se registra `texto` en la tabla de su dimensión ("Bogota" -> "bogota d c")."""
+    return _canonizar_valor(dimension, texto)[0]
+
+
+def canonizar(dimension, serie):
+    """
+    Claves y nombres canónicos de una columna de texto libre. Se calcula una vez por
+    valor distinto (los lotes repiten mucho departamento, tipo y entidad).
+    Retorna (claves, nombres) alineadas con `serie`.
+    """
+    distintos = pd.unique(serie.dropna())
+    tabla = {valor: _canonizar_valor(dimension, valor) for valor in distintos}
+    claves = serie.map(lambda v: tabla[v][0] if v in tabla else None)
+    nombres = serie.map(lambda v: tabla[v][1] if v in tabla else None)
+    return claves, nombres
@@ -1,20 +1,127 @@
+import threading
+import time
 import pandas as pd
+from datetime import datetime
 from sodapy import Socrata
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Optional
 from src.utils.config import Config
+from src.services.esquema import columnas_select, columnas_por_tipo
+from src.services.cache_socrata import CacheRespuestas, SinDatosEnCacheError
 
 # ID del Dataset de SECOP II en Datos Abiertos (Contratos Electrónicos)
 DATASET_ID_SECOP_II = "jbjy-vk9h" 
 URL_DATOS_GOV = "www.datos.gov.co"
 
+# Tamaño de página para las descargas paginadas (filas por petición)
+TAMANO_PAGINA = 5000
+
+# Orden estable para paginar: la fecha sola no es única, :id desempata
+ORDEN_PAGINACION = "fecha_de_firma DESC, :id"
+
+# Columna de sistema de Socrata con la última modificación de cada fila: es la marca de
+# agua de la sincronización (un contrato con adiciones o cambios de valor conserva su
+# fecha_de_firma, pero su :updated_at avanza)
+COLUMNA_ACTUALIZACION = ":updated_at"
+
+def maxima_actualizacion(df: pd.DataFrame) -> Optional[datetime]:
+    """:updated_at más reciente de un lote ya convertido (None si no hay fechas válidas)."""
+    if df.empty or COLUMNA_ACTUALIZACION not in df.columns:
+        return None
+    maxima = df[COLUMNA_ACTUALIZACION].max()
+    if pd.isna(maxima):
+        return None
+    return maxima.to_pydatetime()
+
+class LimitadorTasa:
+    """
+    Token bucket thread-safe: permite `tasa` peticiones por segundo con
+    ráfagas de hasta `capacidad`. Se comparte entre todos los hilos que
+    consultan el mismo endpoint.
+    """
+    def __init__(self, tasa: float, capacidad: int = 1):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self._tokens = float(capacidad)
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._tokens = min(self.capacidad, self._tokens + (ahora - self._ultimo) * self.tasa)
+                self._ultimo = ahora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.tasa
+            time.sleep(espera)
+
+# Limitador global para datos.gov.co (compartido por todos los ClienteSecop)
+LIMITADOR_SOCRATA = LimitadorTasa(Config.SECOP_PETICIONES_POR_SEGUNDO, Config.SECOP_RAFAGA_MAXIMA)
+
+_cache_global = None
+_cache_lock = threading.Lock()
+
+def cache_por_defecto() -> Optional[CacheRespuestas]:
+    """Caché en disco compartido por todos los ClienteSecop (None si está desactivado en Config)."""
+    global _cache_global
+    if Config.SECOP_CACHE_TTL_HORAS <= 0 and not Config.SECOP_OFFLINE:
+        return None
+    with _cache_lock:
+        if _cache_global is None:
+            _cache_global = CacheRespuestas(
+                Config.SECOP_CACHE_DIR,
+                ttl_segundos=Config.SECOP_CACHE_TTL_HORAS * 3600,
+                max_bytes=Config.SECOP_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _cache_global
+
 class ClienteSecop:
-    def __init__(self):
+    def __init__(self,
+                 limitador: Optional[LimitadorTasa] = None,
+                 cache: Optional[CacheRespuestas] = None,
+                 offline: Optional[bool] = None):
         """
         Inicializa el cliente de Socrata para SECOP II usando token de config.
+        El cliente HTTP no es thread-safe: usar una instancia por hilo.
+        Todas las instancias comparten por defecto el limitador y el caché globales.
+        En modo offline solo se responde desde el caché (SinDatosEnCacheError si falta).
         """
         self.client = Socrata(URL_DATOS_GOV, Config.SECOP_APP_TOKEN)
         # Aumentar el tiempo de espera para descargas grandes
         self.client.timeout = 60
+        self.limitador = limitador or LIMITADOR_SOCRATA
+        self.cache = cache or cache_por_defecto()
+        self.offline = Config.SECOP_OFFLINE if offline is None else offline
+
+    def _consultar(self, usar_cache: bool = True, **parametros) -> List[Dict]:
+        """
+        Ejecuta una consulta SoQL respetando el limitador de tasa.
+        Solo se piden las columnas declaradas en el esquema de ingesta ($select), más
+        :updated_at para las marcas de agua.
+        Las respuestas pasan por el caché en disco (clave = dataset + parámetros),
+        salvo con usar_cache=False: consultas cuyo resultado cambia aunque los
+        parámetros no (la sincronización incremental desde una marca de agua).
+        """
+        parametros["select"] = f"{columnas_select()}, {COLUMNA_ACTUALIZACION}"
+
+        clave = None
+        if self.cache is not None and usar_cache:
+            clave = self.cache.clave(DATASET_ID_SECOP_II, parametros)
+            datos = self.cache.obtener(clave, ignorar_ttl=self.offline)
+            if datos is not None:
+                return datos
+
+        if self.offline:
+            raise SinDatosEnCacheError(f"Consulta no disponible sin conexión: {parametros.get('where')}")
+
+        self.limitador.adquirir()
+        datos = self.client.get(DATASET_ID_SECOP_II, **parametros)
+        if clave is not None:
+            self.cache.guardar(clave, datos)
+        return datos
 
     def obtener_contratos(self, 
                           limite: int = 1000, 
@@ -25,30 +132,10 @@ class ClienteSecop:
         Descarga contratos del SECOP II aplicando filtros básicos.
         """
         try:
-            # Construir filtros (cláusula WHERE de SoQL)
-            filtros = {}
-            # Nota: Nombres de columnas corregidos según el error 400 recibido
-            # departamento_entidad -> departamento
-            # ciudad_entidad -> ciudad
-            
-            # Construir la consulta SoQL
-            where_clause = "valor_del_contrato > 0" # Filtro base para evitar basura
-            
-            if departamento:
-                if "Bogotá" in departamento:
-                    # Manejo especial para Bogotá que a veces es D.C. y a veces no
-                    where_clause += f" AND (departamento LIKE '%Bogot%')"
-                else:
-                    where_clause += f" AND departamento = '{departamento}'"
-            
-            if municipio:
-                where_clause += f" AND ciudad = '{municipio}'"
-            if year:
-                where_clause += f" AND date_extract_y(fecha_de_firma) = '{year}'"
+            where_clause = self._construir_filtro(departamento, municipio, year)
 
             # Ejecutar consulta
-            resultados = self.client.get(
-                DATASET_ID_SECOP_II,
+            resultados = self._consultar(
                 limit=limite,
                 where=where_clause,
                 order="fecha_de_firma DESC" # Traer los más recientes primero
@@ -60,6 +147,82 @@ class ClienteSecop:
             print(f"Error conectando a SECOP: {e}")
             return []
 
+    def iterar_contratos(self,
+                         departamento: Optional[str] = None,
+                         municipio: Optional[str] = None,
+                         year: Optional[int] = None,
+                         desde: Optional[datetime] = None,
+                         actualizados_desde: Optional[datetime] = None,
+                         tamano_pagina: int = TAMANO_PAGINA,
+                         offset_inicial: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Recorre TODO el resultado de la consulta paginando con $offset/$order
+        y entrega DataFrames de máximo `tamano_pagina` filas.
+        A diferencia de obtener_contratos, no hay tope de filas y los errores
+        de conexión se propagan para que el llamador decida si reintentar.
+        `desde` limita a contratos con fecha_de_firma >= esa fecha (ventana inicial de la
+        sincronización) y `actualizados_desde` a filas con :updated_at >= esa fecha (la
+        marca de agua: incluye contratos antiguos modificados después).
+        Esas consultas no pasan por el caché en disco: repetir la misma marca dentro del
+        TTL devolvería las páginas viejas y se perderían los contratos nuevos.
+        `offset_inicial` permite reanudar un recorrido interrumpido; la página i
+        corresponde siempre al offset offset_inicial + i * tamano_pagina.
+        """
+        where_clause = self._construir_filtro(departamento, municipio, year, desde, actualizados_desde)
+        offset = offset_inicial
+
+        while True:
+            pagina = self._consultar(
+                usar_cache=desde is None and actualizados_desde is None,
+                limit=tamano_pagina,
+                offset=offset,
+                where=where_clause,
+                order=ORDEN_PAGINACION
+            )
+
+            if not pagina:
+                break
+
+            yield self.convertir_a_dataframe(pagina)
+
+            # Página incompleta = última página
+            if len(pagina) < tamano_pagina:
+                break
+            offset += tamano_pagina
+
+    def _construir_filtro(self,
+                          departamento: Optional[str] = None,
+                          municipio: Optional[str] = None,
+                          year: Optional[int] = None,
+                          desde: Optional[datetime] = None,
+                          actualizados_desde: Optional[datetime] = None) -> str:
+        """Construye la cláusula WHERE de SoQL a partir de los filtros básicos."""
+        # Nota: Nombres de columnas corregidos según el error 400 recibido
+        # departamento_entidad -> departamento
+        # ciudad_entidad -> ciudad
+        where_clause = "valor_del_contrato > 0" # Filtro base para evitar basura
+
+        if departamento:
+            if "Bogotá" in departamento:
+                # Manejo especial para Bogotá que a veces es D.C. y a veces no
+                where_clause += f" AND (departamento LIKE '%Bogot%')"
+            else:
+                where_clause += f" AND departamento = '{departamento}'"
+
+        if municipio:
+            where_clause += f" AND ciudad = '{municipio}'"
+        if year:
+            where_clause += f" AND date_extract_y(fecha_de_firma) = '{year}'"
+        if desde:
+            # >= (no >): contratos firmados en el mismo instante que la marca pudieron
+            # publicarse después; los repetidos se descartan al guardar.
+            where_clause += f" AND fecha_de_firma >= '{desde.strftime('%Y-%m-%dT%H:%M:%S')}'"
+        if actualizados_desde:
+            # >= por la misma razón; los que no cambiaron los descarta el hash de contenido
+            where_clause += f" AND {COLUMNA_ACTUALIZACION} >= '{actualizados_desde.strftime('%Y-%m-%dT%H:%M:%S')}'"
+
+        return where_clause
+
     def convertir_a_dataframe(self, datos: List[Dict]) -> pd.DataFrame:
         """Convierte la lista de resultados JSON en un DataFrame de Pandas limpio."""
         if not datos:
@@ -67,17 +230,20 @@ class ClienteSecop:
             
         df = pd.DataFrame.from_records(datos)
         
-        # Convertir columnas numéricas
-        cols_numericas = ['valor_del_contrato', 'valor_total_de_adiciones']
+        # Convertir columnas numéricas (según el esquema de ingesta)
+        cols_numericas = columnas_por_tipo("decimal", "entero")
         for col in cols_numericas:
             if col in df.columns:
                 df[col] = pd.to_numeric(df[col], errors='coerce')
                 
         # Convertir fechas
-        cols_fechas = ['fecha_de_firma', 'fecha_de_inicio_del_contrato', 'fecha_de_fin_del_contrato']
+        cols_fechas = columnas_por_tipo("fecha")
         for col in cols_fechas:
             if col in df.columns:
                 df[col] = pd.to_datetime(df[col], errors='coerce')
+        if COLUMNA_ACTUALIZACION in df.columns:
+            # Socrata la entrega en UTC; la marca de agua se guarda sin zona horaria
+            df[COLUMNA_ACTUALIZACION] = pd.to_datetime(df[COLUMNA_ACTUALIZACION], errors='coerce', utc=True).dt.tz_localize(None)
                 
         return df
 
@@ -0,0 +1,97 @@
+import os
+import json
+import time
+from src.database.db_manager import GestorBaseDatos, RUTA_DB, TIPOS_FEATURES_ENTRENAMIENTO
+
+try:
+    from pyarrow import feather
+    ARROW_DISPONIBLE = True
+except ImportError:
+    ARROW_DISPONIBLE = False
+
+# Snapshot columnar de las variables analíticas, junto a base_datos_app.db
+DIRECTORIO_SNAPSHOT = os.path.dirname(RUTA_DB)
+RUTA_MANIFIESTO = os.path.join(DIRECTORIO_SNAPSHOT, "snapshot_proyectos.json")
+
+
+def _leer_manifiesto():
+    try:
+        with open(RUTA_MANIFIESTO, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def exportar_snapshot(gestor=None):
+    """
+    Escribe un snapshot Feather (sin compresión, columnas de texto como diccionario/categoría)
+    de GestorBaseDatos.obtener_features_entrenamiento() y lo registra en el manifiesto.
+    Cada exportación crea una versión nueva; la anterior se borra al publicar la nueva.
+    """
+    if not ARROW_DISPONIBLE:
+        raise RuntimeError("pyarrow no está instalado: no se puede escribir el snapshot columnar.")
+
+    gestor = gestor or GestorBaseDatos()
+    # La marca se toma ANTES de leer: si alguien escribe durante la exportación el snapshot queda vencido.
+    # Es la generación de los datos de proyectos, no el mtime del archivo: puntuar el
+    # portafolio escribe en la BD pero no cambia las variables del snapshot.
+    marca_datos = gestor.obtener_marca_datos()
+    features = gestor.obtener_features_entrenamiento()
+
+    anterior = _leer_manifiesto()
+    version = (anterior["version"] + 1) if anterior else 1
+    archivo = f"snapshot_proyectos_v{version}.feather"
+    ruta = os.path.join(DIRECTORIO_SNAPSHOT, archivo)
+
+    # Sin compresión para que la lectura pueda mapear el archivo en memoria
+    features.to_feather(f"{ruta}.tmp", compression="uncompressed")
+    os.replace(f"{ruta}.tmp", ruta)
+
+    manifiesto = {
+        "version": version,
+        "archivo": archivo,
+        "filas": len(features),
+        "columnas": features.columns.tolist(),
+        "marca_datos": marca_datos,
+        "creado": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    with open(f"{RUTA_MANIFIESTO}.tmp", "w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2)
+    os.replace(f"{RUTA_MANIFIESTO}.tmp", RUTA_MANIFIESTO)
+
+    if anterior and anterior["archivo"] != archivo:
+        try:
+            os.remove(os.path.join(DIRECTORIO_SNAPSHOT, anterior["archivo"]))
+        except OSError:
+            pass
+    return ruta
+
+
+def snapshot_vigente(gestor=None):
+    """
+    Ruta del snapshot si existe, tiene las columnas que espera el código actual y
+    ninguna escritura de proyectos/adiciones es posterior a él; si no, None.
+    Las ediciones manuales de la BD (fuera de la app) no avanzan la marca: re-exportar.
+    """
+    manifiesto = _leer_manifiesto()
+    if not manifiesto or manifiesto.get("columnas") != list(TIPOS_FEATURES_ENTRENAMIENTO):
+        return None
+    ruta = os.path.join(DIRECTORIO_SNAPSHOT, manifiesto["archivo"])
+    if not os.path.exists(ruta):
+        return None
+    if manifiesto.get("marca_datos") != (gestor or GestorBaseDatos()).obtener_marca_datos():
+        return None
+    return ruta
+
+
+def cargar_features(gestor=None):
+    """
+    Variables analíticas para entrenamiento/calibración: desde el snapshot columnar
+    (lectura mapeada en memoria) si está vigente; si no, desde SQLite.
+    """
+    if ARROW_DISPONIBLE:
+        ruta = snapshot_vigente(gestor)
+        if ruta:
+            print(f"📦 Cargando variables desde snapshot {os.path.basename(ruta)}")
+            return feather.read_table(ruta, memory_map=True).to_pandas()
+    return (gestor or GestorBaseDatos()).obtener_features_entrenamiento()
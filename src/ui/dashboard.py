@@ -1,17 +1,23 @@
 import sys
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QTableWidget, QTableWidgetItem, QHeaderView,
-                             QFrame, QGridLayout)
-from PyQt6.QtCore import Qt
+                             QFrame, QGridLayout, QLineEdit)
+from PyQt6.QtCore import Qt, QTimer
 from src.database.db_manager import GestorBaseDatos
 
+# Filas que trae cada clic en "Cargar más" (paginación por cursor)
+TAMANO_PAGINA_TABLA = 200
+# Espera tras la última tecla antes de consultar el índice de búsqueda
+ESPERA_BUSQUEDA_MS = 250
+
 class Dashboard(QWidget):
     def __init__(self):
         super().__init__()
         self.gestor = GestorBaseDatos()
+        self.cursor_tabla = None # Cursor de la última página cargada en la tabla
+        self.busqueda_actual = "" # Texto buscado ("" = listado por fecha)
         self.init_ui()
         self.cargar_datos()
 
@@ -58,9 +64,26 @@ class Dashboard(QWidget):
         layout.addLayout(graficos_layout)
 
         # --- Tabla Resumen (Abajo) ---
-        lbl_tabla = QLabel("Últimos Proyectos Registrados")
-        lbl_tabla.setStyleSheet("font-size: 16px; font-weight: bold; margin-top: 10px;")
-        layout.addWidget(lbl_tabla)
+        tabla_header = QHBoxLayout()
+        self.lbl_tabla = QLabel("Últimos Proyectos Registrados")
+        self.lbl_tabla.setStyleSheet("font-size: 16px; font-weight: bold; margin-top: 10px;")
+
+        self.txt_buscar = QLineEdit()
+        self.txt_buscar.setPlaceholderText("Buscar por objeto o entidad...")
+        self.txt_buscar.setClearButtonEnabled(True)
+        self.txt_buscar.setFixedWidth(300)
+
+        # Debounce: se busca cuando el usuario deja de escribir, no en cada tecla
+        self.timer_busqueda = QTimer(self)
+        self.timer_busqueda.setSingleShot(True)
+        self.timer_busqueda.setInterval(ESPERA_BUSQUEDA_MS)
+        self.timer_busqueda.timeout.connect(self.buscar)
+        self.txt_buscar.textChanged.connect(lambda _texto: self.timer_busqueda.start())
+
+        tabla_header.addWidget(self.lbl_tabla)
+        tabla_header.addStretch()
+        tabla_header.addWidget(self.txt_buscar)
+        layout.addLayout(tabla_header)
 
         self.tabla = QTableWidget()
         self.tabla.setColumnCount(5)
@@ -68,6 +91,10 @@ class Dashboard(QWidget):
         self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.tabla)
 
+        self.btn_cargar_mas = QPushButton("Cargar más")
+        self.btn_cargar_mas.clicked.connect(self.cargar_mas_proyectos)
+        layout.addWidget(self.btn_cargar_mas, alignment=Qt.AlignmentFlag.AlignRight)
+
         self.setLayout(layout)
 
     def crear_tarjeta(self, titulo, valor):
@@ -93,33 +120,16 @@ class Dashboard(QWidget):
                 break
 
     def cargar_datos(self):
-        # 1. Obtener datos de la BD (SOLO ÚLTIMOS 1000 PARA VELOCIDAD)
-        proyectos = self.gestor.obtener_ultimos_proyectos(limite=1000)
-        
-        # 2. Calcular KPIs globales reales usando SQL (Optimizado)
+        # 1. Calcular KPIs globales reales usando SQL (Optimizado)
         total_real, suma_presupuesto_real = self.gestor.obtener_kpis_globales()
         
         self.actualizar_tarjeta(self.card_total, f"{total_real:,.0f}")
         self.actualizar_tarjeta(self.card_dinero, f"${suma_presupuesto_real:,.0f}")
-        self.actualizar_tarjeta(self.card_riesgo, "Bajo") # Dummy por ahora
-
-        if not proyectos:
-            return
-
-        # Convertir a DataFrame para facilitar cálculos
-        data = []
-        for p in proyectos:
-            data.append({
-                "id": p.id,
-                "entidad": p.nombre_entidad,
-                "objeto": p.nombre_proyecto,
-                "presupuesto": p.presupuesto_inicial,
-                "depto": p.departamento,
-                "tipo": p.tipo_contrato
-            })
-        df = pd.DataFrame(data)
-
-        # 3. Actualizar Gráfica 1 (Top 5 Deptos - GLOBAL SQL)
+        # Promedio de puntajes_riesgo (lo calcula MotorIA.puntuar_portafolio al entrenar)
+        riesgo_promedio, _ = self.gestor.obtener_riesgo_promedio()
+        self.actualizar_tarjeta(self.card_riesgo, "Sin modelo" if riesgo_promedio is None else f"{riesgo_promedio:.1%}")
+
+        # 2. Actualizar Gráfica 1 (Top 5 Deptos - GLOBAL SQL)
         self.ax1.clear()
         try:
             top_deptos_sql = self.gestor.obtener_top_departamentos()
@@ -136,7 +146,7 @@ class Dashboard(QWidget):
             print(f"Error grafica deptos: {e}")
         self.canvas1.draw()
 
-        # 4. Actualizar Gráfica 2 (Tipos Contrato - GLOBAL SQL)
+        # 3. Actualizar Gráfica 2 (Tipos Contrato - GLOBAL SQL)
         self.ax2.clear()
         try:
             tipos_sql = self.gestor.obtener_tipos_contrato()
@@ -151,12 +161,41 @@ class Dashboard(QWidget):
             print(f"Error grafica tipos: {e}")
         self.canvas2.draw()
 
-        # 5. Llenar Tabla
-        self.tabla.setRowCount(len(df))
-        for i, row in df.iterrows():
-            self.tabla.setItem(i, 0, QTableWidgetItem(str(row['id'])))
-            self.tabla.setItem(i, 1, QTableWidgetItem(str(row['entidad'])))
-            self.tabla.setItem(i, 2, QTableWidgetItem(str(row['objeto'])[:50] + "..."))
-            self.tabla.setItem(i, 3, QTableWidgetItem(f"${row['presupuesto']:,.0f}"))
-            self.tabla.setItem(i, 4, QTableWidgetItem(str(row['depto'])))
-
+        # 4. Llenar Tabla desde la primera página
+        self.buscar()
+
+    def buscar(self):
+        """Reinicia la tabla con el texto del buscador (o el listado por fecha si está vacío)."""
+        self.busqueda_actual = self.txt_buscar.text().strip()
+        if self.busqueda_actual:
+            self.lbl_tabla.setText(f"Resultados para \"{self.busqueda_actual}\"")
+        else:
+            self.lbl_tabla.setText("Últimos Proyectos Registrados")
+        self.tabla.setRowCount(0)
+        self.cursor_tabla = None
+        self.cargar_mas_proyectos()
+
+    def cargar_mas_proyectos(self):
+        """Agrega a la tabla la siguiente página: resultados de búsqueda o proyectos más recientes."""
+        if self.busqueda_actual:
+            filas = self.gestor.buscar_proyectos(
+                self.busqueda_actual, limite=TAMANO_PAGINA_TABLA, offset=self.tabla.rowCount()
+            )
+            hay_mas = len(filas) == TAMANO_PAGINA_TABLA
+        else:
+            filas, self.cursor_tabla = self.gestor.obtener_pagina_proyectos(
+                tamano=TAMANO_PAGINA_TABLA, cursor=self.cursor_tabla
+            )
+            # Sin cursor siguiente ya no quedan proyectos por cargar
+            hay_mas = self.cursor_tabla is not None
+
+        inicio = self.tabla.rowCount()
+        self.tabla.setRowCount(inicio + len(filas))
+        for i, (id_proyecto, entidad, objeto, presupuesto, depto, _tipo, _fecha) in enumerate(filas, start=inicio):
+            self.tabla.setItem(i, 0, QTableWidgetItem(str(id_proyecto)))
+            self.tabla.setItem(i, 1, QTableWidgetItem(str(entidad)))
+            self.tabla.setItem(i, 2, QTableWidgetItem(str(objeto)[:50] + "..."))
+            self.tabla.setItem(i, 3, QTableWidgetItem(f"${presupuesto or 0:,.0f}"))
+            self.tabla.setItem(i, 4, QTableWidgetItem(str(depto)))
+
+        self.btn_cargar_mas.setEnabled(hay_mas)
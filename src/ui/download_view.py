@@ -3,7 +3,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QHeaderView, QMessageBox, QSpinBox, QComboBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
 from src.services.secop_api import ClienteSecop
-from src.database.db_manager import GestorBaseDatos
+from src.database.escritor import obtener_escritor
 
 class WorkerDescarga(QThread):
     """Hilo en segundo plano para no congelar la interfaz mientras descarga."""
@@ -30,8 +30,12 @@ class WorkerDescarga(QThread):
             self.error_ocurrido.emit(str(e))
 
 class VistaDescarga(QWidget):
+    # El guardado termina en el hilo escritor; la señal lo trae de vuelta al hilo de la GUI
+    guardado_terminado = pyqtSignal(int, int, str) # (registros, nuevos, error)
+
     def __init__(self):
         super().__init__()
+        self.guardado_terminado.connect(self.mostrar_guardado)
         self.init_ui()
 
     def init_ui(self):
@@ -95,13 +99,10 @@ class VistaDescarga(QWidget):
             QMessageBox.warning(self, "Sin datos", "No se encontraron contratos con esos filtros.")
             return
 
-        # Guardar en BD automáticamente
-        try:
-            gestor = GestorBaseDatos()
-            nuevos = gestor.guardar_dataframe(df)
-            self.lbl_estado.setText(f"Descarga completada. {len(df)} registros encontrados. ({nuevos} nuevos guardados en BD)")
-        except Exception as e:
-            self.lbl_estado.setText(f"Datos descargados, pero error guardando en BD: {e}")
+        # Guardar en BD automáticamente (en el escritor único, sin bloquear la interfaz)
+        self.lbl_estado.setText(f"Descarga completada. {len(df)} registros encontrados. Guardando en BD...")
+        futuro = obtener_escritor().enviar(df)
+        futuro.add_done_callback(lambda f, total=len(df): self._avisar_guardado(f, total))
 
         # Configurar tabla
         columnas = list(df.columns)
@@ -125,6 +126,17 @@ class VistaDescarga(QWidget):
         
         self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
+    def _avisar_guardado(self, futuro, total):
+        # Corre en el hilo escritor: solo emitir la señal
+        error = futuro.exception()
+        self.guardado_terminado.emit(total, 0 if error else futuro.result(), str(error) if error else "")
+
+    def mostrar_guardado(self, total, nuevos, error):
+        if error:
+            self.lbl_estado.setText(f"Datos descargados, pero error guardando en BD: {error}")
+        else:
+            self.lbl_estado.setText(f"Descarga completada. {total} registros encontrados. ({nuevos} nuevos guardados en BD)")
+
     def mostrar_error(self, error):
         self.btn_descargar.setEnabled(True)
         self.lbl_estado.setText("Error en la descarga.")
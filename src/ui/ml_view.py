@@ -24,6 +24,8 @@ class WorkerEntrenamiento(QThread):
             if "error" in resultados:
                 self.error.emit(resultados["error"])
             else:
+                # Con el modelo nuevo, re-puntuar el portafolio (solo lo pendiente de esta versión)
+                resultados["puntaje"] = self.motor.puntuar_portafolio()
                 self.finalizado.emit(resultados)
         except Exception as e:
             self.error.emit(str(e))
@@ -150,8 +152,8 @@ class VistaML(QWidget):
         self.btn_entrenar.clicked.connect(self.iniciar_entrenamiento)
         col_izq.addWidget(self.btn_entrenar)
 
-        # Botón Eliminar Modelo
-        self.btn_eliminar = QPushButton("Eliminar Modelo Actual")
+        # Botón Eliminar Versión Activa (las versiones anteriores quedan en el almacén)
+        self.btn_eliminar = QPushButton("Eliminar Versión Activa del Modelo")
         self.btn_eliminar.setStyleSheet("padding: 8px; background-color: #c0392b; color: white; font-weight: bold; margin-top: 5px;")
         self.btn_eliminar.setVisible(self.motor.entrenado) # Solo visible si existe
         self.btn_eliminar.clicked.connect(self.eliminar_modelo)
@@ -267,7 +269,10 @@ class VistaML(QWidget):
         precision = resultados['precision']
         self.txt_reporte.setText(f"✅ Entrenamiento Exitoso\n\n"
                                  f"Precisión Global: {precision:.2%}\n"
-                                 f"Datos usados: {resultados['total_datos']}\n\n"
+                                 f"Datos usados: {resultados['total_datos']}\n"
+                                 f"Modo: {resultados['modo']} ({resultados['motivo']})\n"
+                                 f"Árboles: {resultados['arboles']} · Ajuste: {resultados['segundos_entrenamiento']:.1f}s\n"
+                                 f"Proyectos puntuados: {resultados['puntaje'].get('puntuados', 0):,}\n\n"
                                  f"Detalles por clase:\n"
                                  f"{resultados['reporte']}")
 
@@ -291,28 +296,26 @@ class VistaML(QWidget):
         QMessageBox.critical(self, "Error", f"Fallo en entrenamiento:\n{error}")
 
     def eliminar_modelo(self):
-        import os
-        ruta = "data/modelo_entrenado.pkl"
-        if os.path.exists(ruta):
-            try:
-                os.remove(ruta)
-                self.motor.entrenado = False
-                self.motor.model = None # Reset
-                
-                # Reset UI
-                self.btn_predecir.setEnabled(False)
-                self.btn_eliminar.setVisible(False)
-                self.lbl_resultado.setText("Esperando modelo...")
-                self.txt_reporte.clear()
-                self.ax.clear()
-                self.canvas.draw()
-                
-                self.btn_entrenar.setText("Entrenar Modelo (Random Forest)")
-                self.btn_entrenar.setStyleSheet("padding: 10px; background-color: #2ecc71; color: white; font-weight: bold;")
-                
-                QMessageBox.information(self, "Éxito", "Modelo eliminado. El sistema ha olvidado lo aprendido.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"No se pudo eliminar: {e}")
+        try:
+            # Borra la versión activa del almacén de modelos (las anteriores siguen disponibles)
+            self.motor.eliminar_modelo()
+            
+            # Reset UI
+            self.btn_predecir.setEnabled(False)
+            self.btn_eliminar.setVisible(False)
+            self.lbl_resultado.setText("Esperando modelo...")
+            self.txt_reporte.clear()
+            self.ax.clear()
+            self.canvas.draw()
+            
+            self.btn_entrenar.setText("Entrenar Modelo (Random Forest)")
+            self.btn_entrenar.setStyleSheet("padding: 10px; background-color: #2ecc71; color: white; font-weight: bold;")
+            
+            QMessageBox.information(self, "Éxito",
+                                    "Versión activa del modelo eliminada. Las versiones anteriores siguen guardadas "
+                                    "(python -m src.scripts.modelos listar / activar).")
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"No se pudo eliminar: {e}")
 
     def predecir(self):
         res = self.motor.predecir_riesgo(
@@ -7,8 +7,52 @@ load_dotenv(dotenv_path=".env_local")
 class Config:
     SECOP_APP_TOKEN = os.getenv("SECOP_APP_TOKEN")
     SECOP_API_SECRET = os.getenv("SECOP_API_SECRET")
+
+    # Límite global de peticiones al endpoint de Socrata (token bucket)
+    SECOP_PETICIONES_POR_SEGUNDO = float(os.getenv("SECOP_PETICIONES_POR_SEGUNDO", "2"))
+    SECOP_RAFAGA_MAXIMA = int(os.getenv("SECOP_RAFAGA_MAXIMA", "4"))
+
+    # Caché en disco de respuestas de Socrata (TTL 0 = desactivado)
+    SECOP_CACHE_DIR = os.getenv("SECOP_CACHE_DIR", os.path.join("data", "cache_socrata"))
+    SECOP_CACHE_TTL_HORAS = float(os.getenv("SECOP_CACHE_TTL_HORAS", "12"))
+    SECOP_CACHE_MAX_MB = int(os.getenv("SECOP_CACHE_MAX_MB", "500"))
+    # Modo offline: servir solo desde el caché, sin tocar la red
+    SECOP_OFFLINE = os.getenv("SECOP_OFFLINE", "0").lower() in ("1", "true", "si", "yes")
     
     # Base de datos
     DB_PATH = os.path.join("data", "base_datos_app.db")
     DB_URL = f"sqlite:///{DB_PATH}"
+    # Perfil de PRAGMAs de SQLite (ver src/database/conexion.py)
+    SQLITE_PERFIL = os.getenv("SQLITE_PERFIL", "rendimiento")
+    # Tope de memoria del caché de resultados de consultas (0 = desactivado)
+    CACHE_CONSULTAS_MAX_MB = int(os.getenv("CACHE_CONSULTAS_MAX_MB", "64"))
+    # Escritor único de la BD: filas máximas por transacción y DataFrames en espera
+    ESCRITOR_MAX_FILAS_TRANSACCION = int(os.getenv("ESCRITOR_MAX_FILAS_TRANSACCION", "20000"))
+    ESCRITOR_COLA_MAXIMA = int(os.getenv("ESCRITOR_COLA_MAXIMA", "8"))
+
 
+    # Entrenamiento del Random Forest (n_jobs -1 = todos los núcleos)
+    ENTRENAMIENTO_N_JOBS = int(os.getenv("ENTRENAMIENTO_N_JOBS", "-1"))
+    ENTRENAMIENTO_ARBOLES = int(os.getenv("ENTRENAMIENTO_ARBOLES", "100"))
+    # Modo incremental (warm_start): árboles que se agregan por cada re-entrenamiento con datos nuevos
+    ENTRENAMIENTO_ARBOLES_INCREMENTO = int(os.getenv("ENTRENAMIENTO_ARBOLES_INCREMENTO", "20"))
+    # Política de reconstrucción: entrenar desde cero si los datos nuevos superan esta fracción
+    # del total o si el bosque llegaría a este número de árboles
+    ENTRENAMIENTO_MAX_FRACCION_NUEVOS = float(os.getenv("ENTRENAMIENTO_MAX_FRACCION_NUEVOS", "0.3"))
+    ENTRENAMIENTO_MAX_ARBOLES = int(os.getenv("ENTRENAMIENTO_MAX_ARBOLES", "300"))
+    # Con menos filas nuevas que esto no vale la pena agregar árboles (se acumulan para la próxima)
+    ENTRENAMIENTO_MIN_FILAS_NUEVAS = int(os.getenv("ENTRENAMIENTO_MIN_FILAS_NUEVAS", "200"))
+    # Puntaje de riesgo del portafolio completo: proyectos por lote (una transacción por lote)
+    PUNTAJE_TAMANO_LOTE = int(os.getenv("PUNTAJE_TAMANO_LOTE", "20000"))
+    # Caché LRU de predicciones individuales recientes (simulador what-if)
+    PREDICCION_CACHE_MAX = int(os.getenv("PREDICCION_CACHE_MAX", "1024"))
+    # Almacén de modelos (data/modelos): versiones que se conservan para hacer rollback
+    MODELOS_MAX_VERSIONES = int(os.getenv("MODELOS_MAX_VERSIONES", "5"))
+    # Búsqueda de hiperparámetros: presupuesto de reloj, procesos (0 = núcleos - 1), pliegues,
+    # árboles por configuración, filas máximas (submuestra) y tolerancia de la parada temprana
+    BUSQUEDA_PRESUPUESTO_SEGUNDOS = float(os.getenv("BUSQUEDA_PRESUPUESTO_SEGUNDOS", "600"))
+    BUSQUEDA_PROCESOS = int(os.getenv("BUSQUEDA_PROCESOS", "0"))
+    BUSQUEDA_PLIEGUES = int(os.getenv("BUSQUEDA_PLIEGUES", "3"))
+    BUSQUEDA_ARBOLES = int(os.getenv("BUSQUEDA_ARBOLES", "50"))
+    BUSQUEDA_MAX_FILAS = int(os.getenv("BUSQUEDA_MAX_FILAS", "100000"))
+    BUSQUEDA_TOLERANCIA = float(os.getenv("BUSQUEDA_TOLERANCIA", "0.01"))